@@ -1,3 +1,5 @@
+import itertools
+
 from django.conf import settings
 from django.contrib import admin
 from django.shortcuts import reverse, redirect
@@ -5,6 +7,7 @@ from django.templatetags.static import static
 from django.utils.html import format_html
 from django.utils.http import url_has_allowed_host_and_scheme
 
+from .models import Banner
 from .models import Order
 from .models import OrderItem
 from .models import Product
@@ -19,6 +22,67 @@ class RestaurantMenuItemInline(admin.TabularInline):
     extra = 0
 
 
+def set_menu_availability(modeladmin, request, menu_items, availability):
+    updated, created = RestaurantMenuItem.objects.set_availability(
+        (restaurant_id, product_id, availability)
+        for restaurant_id, product_id in menu_items
+    )
+    modeladmin.message_user(
+        request,
+        f'Изменено пунктов меню: {updated}, добавлено: {created}'
+    )
+
+
+def make_restaurant_menu_available(modeladmin, request, queryset):
+    set_menu_availability(
+        modeladmin,
+        request,
+        RestaurantMenuItem.objects
+        .filter(restaurant__in=queryset)
+        .values_list('restaurant_id', 'product_id'),
+        True
+    )
+make_restaurant_menu_available.short_description = 'Открыть всё меню'
+
+
+def make_restaurant_menu_unavailable(modeladmin, request, queryset):
+    set_menu_availability(
+        modeladmin,
+        request,
+        RestaurantMenuItem.objects
+        .filter(restaurant__in=queryset)
+        .values_list('restaurant_id', 'product_id'),
+        False
+    )
+make_restaurant_menu_unavailable.short_description = 'Снять всё меню с продажи'
+
+
+def make_product_available(modeladmin, request, queryset):
+    set_menu_availability(
+        modeladmin,
+        request,
+        itertools.product(
+            Restaurant.objects.values_list('id', flat=True),
+            queryset.values_list('id', flat=True)
+        ),
+        True
+    )
+make_product_available.short_description = 'Продавать во всех ресторанах'
+
+
+def make_product_unavailable(modeladmin, request, queryset):
+    set_menu_availability(
+        modeladmin,
+        request,
+        itertools.product(
+            Restaurant.objects.values_list('id', flat=True),
+            queryset.values_list('id', flat=True)
+        ),
+        False
+    )
+make_product_unavailable.short_description = 'Снять с продажи во всех ресторанах'
+
+
 @admin.register(Restaurant)
 class RestaurantAdmin(admin.ModelAdmin):
     search_fields = [
@@ -34,6 +98,10 @@ class RestaurantAdmin(admin.ModelAdmin):
     inlines = [
         RestaurantMenuItemInline
     ]
+    actions = [
+        make_restaurant_menu_available,
+        make_restaurant_menu_unavailable,
+    ]
 
 
 @admin.register(Product)
@@ -60,6 +128,10 @@ class ProductAdmin(admin.ModelAdmin):
     inlines = [
         RestaurantMenuItemInline
     ]
+    actions = [
+        make_product_available,
+        make_product_unavailable,
+    ]
     fieldsets = (
         ('Общее', {
             'fields': [
@@ -134,6 +206,10 @@ class OrderAdmin(admin.ModelAdmin):
         'called_at',
         'delivered_at',
         'payment_method',
+        'total',
+    ]
+    readonly_fields = [
+        'total',
     ]
     inlines = [
         OrderItemInline
@@ -144,12 +220,13 @@ class OrderAdmin(admin.ModelAdmin):
         for instance in instances:
             instance.cost = instance.quantity * instance.product.price
             instance.save()
-        return super().save_formset(
+        super().save_formset(
             request,
             form,
             formset,
             change
         )
+        Order.objects.filter(pk=form.instance.pk).recalculate_totals()
     
     def response_post_save_change(self, request, obj):
         if request.POST['status'] == '1' and request.POST['restaurant']:
@@ -166,6 +243,21 @@ class OrderAdmin(admin.ModelAdmin):
             return response
 
 
+@admin.register(Banner)
+class BannerAdmin(admin.ModelAdmin):
+    list_display = [
+        'title',
+        'text',
+        'src',
+        'position',
+        'is_active',
+    ]
+    list_editable = [
+        'position',
+        'is_active',
+    ]
+
+
 @admin.register(Place)
 class PlaceAdmin(admin.ModelAdmin):
     pass
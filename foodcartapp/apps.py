@@ -1,6 +1,39 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class FoodcartappConfig(AppConfig):
     default_auto_field = 'django.db.models.AutoField'
     name = 'foodcartapp'
+
+    def ready(self):
+        from . import signals
+        from .models import menu_availability_changed
+
+        for model_name in ['Product', 'ProductCategory', 'RestaurantMenuItem']:
+            model = self.get_model(model_name)
+            post_save.connect(signals.invalidate_catalogue_cache, sender=model)
+            post_delete.connect(
+                signals.invalidate_catalogue_cache,
+                sender=model
+            )
+
+        Banner = self.get_model('Banner')
+        post_save.connect(signals.invalidate_banners_cache, sender=Banner)
+        post_delete.connect(signals.invalidate_banners_cache, sender=Banner)
+
+        for model_name in ['Restaurant', 'RestaurantMenuItem']:
+            model = self.get_model(model_name)
+            post_save.connect(
+                signals.invalidate_availability_matrix,
+                sender=model
+            )
+            post_delete.connect(
+                signals.invalidate_availability_matrix,
+                sender=model
+            )
+
+        menu_availability_changed.connect(
+            signals.invalidate_menu_caches,
+            sender=self.get_model('RestaurantMenuItem')
+        )
@@ -0,0 +1,39 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class VersionedPayload:
+    def __init__(self, name, render):
+        self.name = name
+        self.render = render
+        self.version_key = f'foodcartapp:{name}:version'
+
+    def get_version(self):
+        return cache.get_or_set(self.version_key, 1, timeout=None)
+
+    def invalidate(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 1, timeout=None)
+
+    def get(self):
+        version = self.get_version()
+        cache_key = f'foodcartapp:{self.name}:{version}'
+        payload = cache.get(cache_key)
+        if payload is None:
+            payload = self.render()
+            payload['version'] = version
+            if 'body' in payload:
+                payload.setdefault(
+                    'etag',
+                    hashlib.sha1(payload['body']).hexdigest()
+                )
+            cache.set(
+                cache_key,
+                payload,
+                timeout=settings.CACHE_PAYLOAD_TIMEOUT
+            )
+        return payload
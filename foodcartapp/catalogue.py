@@ -0,0 +1,86 @@
+from django.db.models import Max
+from django.templatetags.static import static
+
+from star_burger.renderers import dumps
+
+from .cache import VersionedPayload
+from .models import Banner, Product, Restaurant, RestaurantMenuItem
+
+
+def serialize_product(product):
+    return {
+        'id': product.id,
+        'name': product.name,
+        'price': product.price,
+        'special_status': product.special_status,
+        'description': product.description,
+        'category': {
+            'id': product.category.id,
+            'name': product.category.name,
+        } if product.category else None,
+        'image': product.image.url,
+        'restaurant': {
+            'id': product.id,
+            'name': product.name,
+        }
+    }
+
+
+def serialize_banner(banner):
+    return {
+        'title': banner.title,
+        'src': static(banner.src),
+        'text': banner.text,
+    }
+
+
+def render_catalogue():
+    products = Product.objects.select_related('category').available()
+    return {
+        'body': dumps([serialize_product(product) for product in products]),
+    }
+
+
+def render_banners():
+    banners = Banner.objects.filter(is_active=True)
+    return {
+        'body': dumps([serialize_banner(banner) for banner in banners]),
+        'last_modified': Banner.objects.aggregate(
+            last_modified=Max('updated_at')
+        )['last_modified'],
+    }
+
+
+def render_availability_matrix():
+    restaurants = list(
+        Restaurant.objects.order_by('name').values_list('id', 'name')
+    )
+    columns = {
+        restaurant_id: column
+        for column, (restaurant_id, _) in enumerate(restaurants)
+    }
+    rows = {}
+    menu_items = (
+        RestaurantMenuItem.objects
+        .filter(availability=True)
+        .values_list('product_id', 'restaurant_id')
+    )
+    for product_id, restaurant_id in menu_items:
+        row = rows.get(product_id, 0)
+        rows[product_id] = row | 1 << columns[restaurant_id]
+    return {
+        'restaurants': restaurants,
+        'rows': rows,
+    }
+
+
+def unpack_availability(row, columns_count):
+    return [bool(row >> column & 1) for column in range(columns_count)]
+
+
+catalogue = VersionedPayload('catalogue', render_catalogue)
+banners = VersionedPayload('banners', render_banners)
+availability_matrix = VersionedPayload(
+    'availability-matrix',
+    render_availability_matrix
+)
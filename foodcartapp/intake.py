@@ -0,0 +1,187 @@
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+
+from django.conf import settings
+
+from .models import Order
+from .serializers import OrderSerializer, get_order_serializer_context
+
+PENDING = 'pending'
+PROCESSING = 'processing'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class OrderJournal:
+    def __init__(self, path):
+        self.path = path
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=FULL')
+        connection.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tracking_id TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                order_id INTEGER,
+                errors TEXT,
+                created_at REAL NOT NULL,
+                claimed_at REAL
+            )
+        ''')
+        connection.execute(
+            'CREATE INDEX IF NOT EXISTS entries_status ON entries (status, id)'
+        )
+        return connection
+
+    def append(self, payload):
+        tracking_id = uuid.uuid4().hex
+        with closing(self._connect()) as connection:
+            connection.execute(
+                'INSERT INTO entries (tracking_id, payload, status, created_at) '
+                'VALUES (?, ?, ?, ?)',
+                (tracking_id, json.dumps(payload), PENDING, time.time())
+            )
+        return tracking_id
+
+    def claim(self, limit):
+        with closing(self._connect()) as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            entries = connection.execute(
+                'SELECT id, tracking_id, payload FROM entries '
+                'WHERE status = ? ORDER BY id LIMIT ?',
+                (PENDING, limit)
+            ).fetchall()
+            connection.executemany(
+                'UPDATE entries SET status = ?, claimed_at = ? WHERE id = ?',
+                [(PROCESSING, time.time(), entry['id']) for entry in entries]
+            )
+            connection.execute('COMMIT')
+        return [
+            (entry['tracking_id'], json.loads(entry['payload']))
+            for entry in entries
+        ]
+
+    def requeue_stale(self, older_than):
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                'UPDATE entries SET status = ?, claimed_at = NULL '
+                'WHERE status = ? AND claimed_at < ?',
+                (PENDING, PROCESSING, time.time() - older_than)
+            )
+        return cursor.rowcount
+
+    def release(self, tracking_ids):
+        with closing(self._connect()) as connection:
+            connection.executemany(
+                'UPDATE entries SET status = ?, claimed_at = NULL '
+                'WHERE tracking_id = ? AND status = ?',
+                [
+                    (PENDING, tracking_id, PROCESSING)
+                    for tracking_id in tracking_ids
+                ]
+            )
+
+    def mark_done(self, order_ids):
+        with closing(self._connect()) as connection:
+            connection.executemany(
+                'UPDATE entries SET status = ?, order_id = ? '
+                'WHERE tracking_id = ?',
+                [
+                    (DONE, order_id, tracking_id)
+                    for tracking_id, order_id in order_ids.items()
+                ]
+            )
+
+    def mark_failed(self, errors):
+        with closing(self._connect()) as connection:
+            connection.executemany(
+                'UPDATE entries SET status = ?, errors = ? '
+                'WHERE tracking_id = ?',
+                [
+                    (FAILED, json.dumps(entry_errors), tracking_id)
+                    for tracking_id, entry_errors in errors.items()
+                ]
+            )
+
+    def get(self, tracking_id):
+        with closing(self._connect()) as connection:
+            entry = connection.execute(
+                'SELECT tracking_id, status, order_id, errors FROM entries '
+                'WHERE tracking_id = ?',
+                (tracking_id,)
+            ).fetchone()
+        if not entry:
+            return None
+        return {
+            'tracking_id': entry['tracking_id'],
+            'status': entry['status'],
+            'order_id': entry['order_id'],
+            'errors': json.loads(entry['errors']) if entry['errors'] else None,
+        }
+
+    def count_pending(self):
+        with closing(self._connect()) as connection:
+            return connection.execute(
+                'SELECT COUNT(*) FROM entries WHERE status IN (?, ?)',
+                (PENDING, PROCESSING)
+            ).fetchone()[0]
+
+
+def get_order_journal():
+    return OrderJournal(settings.ORDER_INTAKE_JOURNAL)
+
+
+def drain_order_journal(journal, batch_size):
+    entries = journal.claim(batch_size)
+    if not entries:
+        return 0
+
+    tracking_ids = [tracking_id for tracking_id, _ in entries]
+    try:
+        save_journal_entries(journal, entries, tracking_ids)
+    except Exception:
+        journal.release(tracking_ids)
+        raise
+    return len(entries)
+
+
+def save_journal_entries(journal, entries, tracking_ids):
+    order_ids = dict(
+        Order.objects
+        .filter(tracking_id__in=tracking_ids)
+        .values_list('tracking_id', 'id')
+    )
+    serializer_context = get_order_serializer_context(
+        [payload for _, payload in entries]
+    )
+    valid_tracking_ids = []
+    valid_orders_fields = []
+    errors = {}
+    for tracking_id, payload in entries:
+        if tracking_id in order_ids:
+            continue
+        serializer = OrderSerializer(data=payload, context=serializer_context)
+        if serializer.is_valid():
+            valid_tracking_ids.append(tracking_id)
+            valid_orders_fields.append({
+                **serializer.validated_data,
+                'tracking_id': tracking_id,
+            })
+        else:
+            errors[tracking_id] = serializer.errors
+
+    orders = Order.objects.create_with_items(valid_orders_fields)
+    order_ids.update({
+        tracking_id: order.id
+        for tracking_id, order in zip(valid_tracking_ids, orders)
+    })
+    journal.mark_done(order_ids)
+    journal.mark_failed(errors)
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from foodcartapp.intake import drain_order_journal, get_order_journal
+
+
+class Command(BaseCommand):
+    help = 'Переносит заказы из локального журнала приёма в базу данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1,
+            help='пауза в секундах, когда журнал пуст',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=float,
+            default=300,
+            help='через сколько секунд вернуть в очередь зависшие заказы',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='обработать накопившиеся заказы и выйти',
+        )
+
+    def handle(self, *args, **options):
+        journal = get_order_journal()
+        while True:
+            requeued = journal.requeue_stale(options['stale_after'])
+            if requeued:
+                self.stdout.write(f'Возвращено в очередь: {requeued}')
+
+            drained = drain_order_journal(journal, options['batch_size'])
+            if drained:
+                self.stdout.write(f'Обработано заказов: {drained}')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,231 @@
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+
+from foodcartapp.synthetic import generate_address
+from star_burger.metrics import get_percentile
+
+CART_SIZES = [1, 2, 3, 4, 5, 6, 8]
+CART_SIZE_WEIGHTS = [30, 25, 18, 12, 7, 5, 3]
+QUANTITY_WEIGHTS = [70, 20, 7, 3]
+
+
+class InProcessTransport:
+    def __init__(self):
+        host = next(
+            (host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'),
+            'localhost'
+        )
+        self.client = Client(raise_request_exception=False, HTTP_HOST=host)
+
+    def get(self, path):
+        response = self.client.get(path)
+        return response.status_code, response.content
+
+    def post(self, path, payload):
+        response = self.client.post(
+            path,
+            json.dumps(payload),
+            content_type='application/json'
+        )
+        return response.status_code, response.content
+
+    def finish_session(self):
+        connections.close_all()
+
+    def close(self):
+        pass
+
+
+class HTTPTransport:
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def get(self, path):
+        response = self.session.get(
+            f'{self.base_url}{path}',
+            timeout=self.timeout
+        )
+        return response.status_code, response.content
+
+    def post(self, path, payload):
+        response = self.session.post(
+            f'{self.base_url}{path}',
+            json=payload,
+            timeout=self.timeout
+        )
+        return response.status_code, response.content
+
+    def finish_session(self):
+        pass
+
+    def close(self):
+        self.session.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Имитирует сессии покупателей: загружает каталог и баннеры и '
+        'оформляет заказы. Заказы сохраняются в настоящую базу данных'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='адрес запущенного сайта, например http://127.0.0.1:8000. '
+                 'Без него запросы выполняются внутри процесса',
+        )
+        parser.add_argument('--sessions', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument(
+            '--replay',
+            help='файл с заказами в формате NDJSON, которые нужно повторить '
+                 'вместо случайных корзин',
+        )
+        parser.add_argument('--timeout', type=float, default=10)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.replayed_orders = []
+        if options['replay']:
+            with open(options['replay'], encoding='utf-8') as replay_file:
+                self.replayed_orders = [
+                    json.loads(line) for line in replay_file if line.strip()
+                ]
+            if not self.replayed_orders:
+                raise CommandError('В файле нет заказов')
+
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.local = threading.local()
+        transports = []
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            sessions = executor.map(
+                lambda number: self.run_session(number, transports),
+                range(options['sessions'])
+            )
+            list(sessions)
+        elapsed = time.perf_counter() - started_at
+
+        for transport in transports:
+            transport.close()
+        self.report(elapsed)
+
+    def get_transport(self, transports):
+        transport = getattr(self.local, 'transport', None)
+        if transport is None:
+            if self.options['url']:
+                transport = HTTPTransport(
+                    self.options['url'],
+                    self.options['timeout']
+                )
+            else:
+                transport = InProcessTransport()
+            self.local.transport = transport
+            with self.lock:
+                transports.append(transport)
+        return transport
+
+    def send(self, name, send_request):
+        started_at = time.perf_counter()
+        try:
+            status_code, content = send_request()
+        except requests.RequestException:
+            status_code, content = None, b''
+        latency = time.perf_counter() - started_at
+        with self.lock:
+            self.latencies[name].append(latency)
+            if status_code is None or status_code >= 400:
+                self.errors[name] += 1
+        return status_code, content
+
+    def run_session(self, number, transports):
+        transport = self.get_transport(transports)
+        try:
+            self.simulate_session(number, transport)
+        finally:
+            transport.finish_session()
+
+    def simulate_session(self, number, transport):
+        randomizer = random.Random(
+            None if self.options['seed'] is None
+            else self.options['seed'] + number
+        )
+        status_code, content = self.send(
+            '/api/products/',
+            lambda: transport.get('/api/products/')
+        )
+        self.send('/api/banners/', lambda: transport.get('/api/banners/'))
+        if status_code != 200:
+            return
+
+        if self.replayed_orders:
+            order_payload = self.replayed_orders[
+                number % len(self.replayed_orders)
+            ]
+        else:
+            product_ids = [product['id'] for product in json.loads(content)]
+            if not product_ids:
+                return
+            order_payload = self.generate_order(randomizer, product_ids)
+        self.send(
+            '/api/order/',
+            lambda: transport.post('/api/order/', order_payload)
+        )
+
+    def generate_order(self, randomizer, product_ids):
+        cart_size, = randomizer.choices(CART_SIZES, CART_SIZE_WEIGHTS)
+        products = randomizer.sample(
+            product_ids,
+            min(cart_size, len(product_ids))
+        )
+        return {
+            'firstname': 'Нагрузочный',
+            'lastname': 'Тест',
+            'phonenumber': f'+7916{randomizer.randrange(10 ** 7):07d}',
+            'address': generate_address(randomizer),
+            'products': [
+                {
+                    'product': product_id,
+                    'quantity': randomizer.choices(
+                        range(1, len(QUANTITY_WEIGHTS) + 1),
+                        QUANTITY_WEIGHTS
+                    )[0],
+                }
+                for product_id in products
+            ],
+        }
+
+    def report(self, elapsed):
+        self.stdout.write(
+            f'Сессий: {self.options["sessions"]}, потоков: '
+            f'{self.options["concurrency"]}, время: {elapsed:.2f} с'
+        )
+        self.stdout.write(
+            f'{"эндпоинт":<18}{"запросов":>9}{"ошибок":>8}{"в секунду":>11}'
+            f'{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}'
+        )
+        for name, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            self.stdout.write(
+                f'{name:<18}{len(latencies):>9}{self.errors[name]:>8}'
+                f'{len(latencies) / elapsed:>11.1f}'
+                f'{get_percentile(latencies, 50) * 1000:>10.1f}'
+                f'{get_percentile(latencies, 95) * 1000:>10.1f}'
+                f'{get_percentile(latencies, 99) * 1000:>10.1f}'
+            )
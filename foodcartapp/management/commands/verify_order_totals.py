@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from foodcartapp.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Сверяет сохранённую стоимость заказов с суммой по их позициям'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repair',
+            action='store_true',
+            help='пересчитать стоимость расходящихся заказов',
+        )
+
+    def handle(self, *args, **options):
+        drifted_orders = list(
+            Order.objects
+            .with_drifted_total()
+            .values_list('id', 'total', 'items_total')
+        )
+        for order_id, total, items_total in drifted_orders:
+            self.stdout.write(
+                f'Заказ {order_id}: сохранено {total}, по позициям {items_total}'
+            )
+
+        if not drifted_orders:
+            self.stdout.write('Расхождений нет')
+            return
+        if not options['repair']:
+            self.stdout.write(f'Расходящихся заказов: {len(drifted_orders)}')
+            return
+
+        repaired = (
+            Order.objects
+            .filter(id__in=[order_id for order_id, _, _ in drifted_orders])
+            .recalculate_totals()
+        )
+        self.stdout.write(f'Исправлено заказов: {repaired}')
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+
+BANNERS = [
+    {
+        'title': 'Burger',
+        'src': 'burger.jpg',
+        'text': 'Tasty Burger at your door step',
+    },
+    {
+        'title': 'Spices',
+        'src': 'food.jpg',
+        'text': 'All Cuisines',
+    },
+    {
+        'title': 'New York',
+        'src': 'tasty.jpg',
+        'text': 'Food is incomplete without a tasty dessert',
+    },
+]
+
+
+def load_banners(apps, schema_editor):
+    Banner = apps.get_model('foodcartapp', 'Banner')
+    Banner.objects.bulk_create([
+        Banner(position=position, **banner)
+        for position, banner in enumerate(BANNERS)
+    ])
+
+
+def unload_banners(apps, schema_editor):
+    Banner = apps.get_model('foodcartapp', 'Banner')
+    Banner.objects.filter(
+        src__in=[banner['src'] for banner in BANNERS]
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0059_banner'),
+    ]
+
+    operations = [
+        migrations.RunPython(load_banners, unload_banners),
+    ]
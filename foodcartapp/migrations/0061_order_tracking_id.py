@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-17 04:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0060_load_banners'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='tracking_id',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True, unique=True, verbose_name='номер в журнале приёма'),
+        ),
+    ]
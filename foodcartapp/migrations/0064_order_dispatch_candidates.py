@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-17 04:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0063_order_board_position_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='dispatch_candidates',
+            field=models.JSONField(blank=True, editable=False, null=True, verbose_name='рестораны, которые могут приготовить заказ'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='dispatch_candidates_updated_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True, verbose_name='дата расчёта ресторанов'),
+        ),
+    ]
@@ -1,10 +1,25 @@
-from django.db import models
-from django.db.models import Prefetch
+from collections import defaultdict
+
+from django.db import connections, models, transaction
+from django.db.models import (
+    DecimalField,
+    F,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+    Sum
+)
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 
 from phonenumber_field.modelfields import PhoneNumberField
 
+orders_created = Signal()
+menu_availability_changed = Signal()
+
 
 class Restaurant(models.Model):
     name = models.CharField(
@@ -97,6 +112,111 @@ class Product(models.Model):
         return self.name
 
 
+class Banner(models.Model):
+    title = models.CharField(
+        'заголовок',
+        max_length=50
+    )
+    text = models.CharField(
+        'текст',
+        max_length=200,
+        blank=True,
+    )
+    src = models.CharField(
+        'картинка',
+        max_length=255,
+        help_text='путь к файлу в статике, например burger.jpg',
+    )
+    position = models.PositiveSmallIntegerField(
+        'позиция',
+        default=0,
+        db_index=True,
+    )
+    is_active = models.BooleanField(
+        'показывать',
+        default=True,
+        db_index=True,
+    )
+    updated_at = models.DateTimeField(
+        'дата изменения',
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name = 'баннер'
+        verbose_name_plural = 'баннеры'
+        ordering = ['position', 'id']
+
+    def __str__(self):
+        return self.title
+
+
+class RestaurantMenuItemQuerySet(models.QuerySet):
+    def get_restaurants_by_product(self):
+        menu_items = (
+            self
+            .filter(availability=True)
+            .values_list('product_id', 'restaurant_id')
+        )
+        restaurants_by_product = defaultdict(set)
+        for product_id, restaurant_id in menu_items:
+            restaurants_by_product[product_id].add(restaurant_id)
+        return {
+            product_id: frozenset(restaurant_ids)
+            for product_id, restaurant_ids in restaurants_by_product.items()
+        }
+
+    def set_availability(self, changes):
+        changes = {
+            (restaurant_id, product_id): availability
+            for restaurant_id, product_id, availability in changes
+        }
+        restaurant_ids = {restaurant_id for restaurant_id, _ in changes}
+        product_ids = {product_id for _, product_id in changes}
+        with transaction.atomic(using=self.db):
+            menu_items = {
+                (menu_item.restaurant_id, menu_item.product_id): menu_item
+                for menu_item in self.select_for_update().filter(
+                    restaurant_id__in=restaurant_ids,
+                    product_id__in=product_ids,
+                )
+            }
+            updated_items = []
+            new_items = []
+            for (restaurant_id, product_id), availability in changes.items():
+                menu_item = menu_items.get((restaurant_id, product_id))
+                if menu_item is None:
+                    if availability:
+                        new_items.append(self.model(
+                            restaurant_id=restaurant_id,
+                            product_id=product_id,
+                            availability=availability,
+                        ))
+                elif menu_item.availability != availability:
+                    menu_item.availability = availability
+                    updated_items.append(menu_item)
+
+            self.bulk_update(updated_items, ['availability'])
+            self.bulk_create(new_items, ignore_conflicts=True)
+            if updated_items or new_items:
+                menu_availability_changed.send(sender=self.model)
+        return len(updated_items), len(new_items)
+
+
+def find_common_restaurants(restaurants_by_product, product_ids):
+    product_ids = set(product_ids)
+    if not product_ids:
+        return frozenset()
+    restaurant_groups = sorted(
+        (
+            restaurants_by_product.get(product_id, frozenset())
+            for product_id in product_ids
+        ),
+        key=len
+    )
+    return restaurant_groups[0].intersection(*restaurant_groups[1:])
+
+
 class RestaurantMenuItem(models.Model):
     restaurant = models.ForeignKey(
         Restaurant,
@@ -116,6 +236,8 @@ class RestaurantMenuItem(models.Model):
         db_index=True
     )
 
+    objects = RestaurantMenuItemQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'пункт меню ресторана'
         verbose_name_plural = 'пункты меню ресторана'
@@ -128,28 +250,102 @@ class RestaurantMenuItem(models.Model):
 
 
 class OrderQuerySet(models.QuerySet):
+    def order_for_board(self):
+        return self.order_by('status', 'created_at', 'id')
+
+    def after_board_position(self, status, created_at, order_id):
+        return self.filter(
+            Q(status__gt=status)
+            | Q(status=status, created_at__gt=created_at)
+            | Q(status=status, created_at=created_at, id__gt=order_id)
+        )
+
+    def awaiting_dispatch(self):
+        return self.filter(cooking_restaurant__isnull=True).exclude(status='4')
+
     def find_available_restaurants(self):
         orders = self.prefetch_related(
             Prefetch(
                 'items',
-                queryset=OrderItem.objects.select_related('product')
+                queryset=OrderItem.objects.only('order_id', 'product_id')
             )
         )
+        restaurants_by_product = (
+            RestaurantMenuItem.objects.get_restaurants_by_product()
+        )
+        restaurants = Restaurant.objects.in_bulk()
         for order in orders:
-            products_in_restaurants = list()
-            for order_item in order.items.all():
-                restaurants = [menu_item.restaurant for menu_item \
-                    in order_item.product.menu_items.all()]
-                products_in_restaurants.append({
-                    'product': order_item.product,
-                    'restaurants': restaurants
-                })
-            restaurant_groups = [set(product['restaurants']) \
-                for product in products_in_restaurants]
-            order.restaurants = (
-                restaurant_groups[0]
-                .intersection(*restaurant_groups[1:])
+            restaurant_ids = find_common_restaurants(
+                restaurants_by_product,
+                [order_item.product_id for order_item in order.items.all()]
             )
+            order.restaurants = {
+                restaurants[restaurant_id] for restaurant_id in restaurant_ids
+            }
+        return orders
+
+    def with_items_total(self):
+        return self.annotate(
+            items_total=Coalesce(
+                Sum('items__cost'),
+                0,
+                output_field=DecimalField(max_digits=10, decimal_places=2)
+            )
+        )
+
+    def with_drifted_total(self):
+        return self.with_items_total().exclude(total=F('items_total'))
+
+    def recalculate_totals(self):
+        items_total = (
+            OrderItem.objects
+            .filter(order=OuterRef('pk'))
+            .values('order')
+            .annotate(total=Sum('cost'))
+            .values('total')
+        )
+        return self.update(
+            total=Coalesce(
+                Subquery(items_total),
+                0,
+                output_field=DecimalField(max_digits=10, decimal_places=2)
+            )
+        )
+
+    def create_with_items(self, orders_fields):
+        orders = [
+            self.model(
+                total=sum(
+                    item_fields['product'].price * item_fields['quantity']
+                    for item_fields in order_fields['products']
+                ),
+                **{
+                    field: value
+                    for field, value in order_fields.items()
+                    if field != 'products'
+                }
+            )
+            for order_fields in orders_fields
+        ]
+        with transaction.atomic(using=self.db):
+            if connections[self.db].features.can_return_rows_from_bulk_insert:
+                self.bulk_create(orders)
+            else:
+                for order in orders:
+                    order.save(using=self.db)
+
+            order_items = [
+                OrderItem(
+                    order=order,
+                    product=item_fields['product'],
+                    quantity=item_fields['quantity'],
+                    cost=item_fields['product'].price * item_fields['quantity'],
+                )
+                for order, order_fields in zip(orders, orders_fields)
+                for item_fields in order_fields['products']
+            ]
+            OrderItem.objects.using(self.db).bulk_create(order_items)
+            orders_created.send(sender=self.model, orders=orders)
         return orders
 
 
@@ -217,11 +413,46 @@ class Order(models.Model):
         choices=PAYMENT_METHODS,
         default='3',
     )
+    total = models.DecimalField(
+        'стоимость заказа',
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        validators=[MinValueValidator(0)],
+        editable=False,
+    )
+    tracking_id = models.CharField(
+        'номер в журнале приёма',
+        max_length=32,
+        unique=True,
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    dispatch_candidates = models.JSONField(
+        'рестораны, которые могут приготовить заказ',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    dispatch_candidates_updated_at = models.DateTimeField(
+        'дата расчёта ресторанов',
+        null=True,
+        blank=True,
+        db_index=True,
+        editable=False,
+    )
     objects = OrderQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'заказ'
         verbose_name_plural = 'заказы'
+        indexes = [
+            models.Index(
+                fields=['status', 'created_at', 'id'],
+                name='order_board_position_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.phonenumber}'
@@ -0,0 +1,118 @@
+from rest_framework.serializers import (
+    BooleanField,
+    FloatField,
+    IntegerField,
+    ListField,
+    ModelSerializer,
+    PrimaryKeyRelatedField,
+    Serializer
+)
+
+from .models import Order, OrderItem, Product
+
+
+class ProductField(PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        products = self.context.get('products')
+        if products is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            product_id = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if product_id not in products:
+            self.fail('does_not_exist', pk_value=data)
+        return products[product_id]
+
+
+class OrderItemSerializer(ModelSerializer):
+    product = ProductField(queryset=Product.objects.all())
+
+    class Meta:
+        model = OrderItem
+        fields = ['product', 'quantity', 'cost']
+
+
+class OrderItemsField(ListField):
+    default_error_messages = {
+        'unknown_products': 'Товары не найдены: {product_ids}.',
+    }
+
+    def to_internal_value(self, data):
+        products = self.context.get('products')
+        if products is not None and isinstance(data, list):
+            unknown_ids = sorted(collect_item_product_ids(data) - products.keys())
+            if unknown_ids:
+                self.fail(
+                    'unknown_products',
+                    product_ids=', '.join(map(str, unknown_ids))
+                )
+        return super().to_internal_value(data)
+
+
+class OrderSerializer(ModelSerializer):
+    products = OrderItemsField(
+        child=OrderItemSerializer(),
+        allow_empty=False,
+        write_only=True
+    )
+    class Meta:
+        model = Order
+        fields = [
+            'id',  
+            'firstname',
+            'lastname',
+            'address',
+            'phonenumber',
+            'products'
+        ]
+
+
+def collect_item_product_ids(items):
+    product_ids = set()
+    for item in items:
+        if not isinstance(item, dict) or isinstance(item.get('product'), bool):
+            continue
+        try:
+            product_ids.add(int(item.get('product')))
+        except (TypeError, ValueError):
+            continue
+    return product_ids
+
+
+def collect_product_ids(orders_payload):
+    product_ids = set()
+    for order_payload in orders_payload:
+        if not isinstance(order_payload, dict):
+            continue
+        items = order_payload.get('products')
+        if isinstance(items, list):
+            product_ids |= collect_item_product_ids(items)
+    return product_ids
+
+
+def get_order_serializer_context(orders_payload):
+    return {
+        'products': Product.objects.in_bulk(
+            collect_product_ids(orders_payload)
+        ),
+    }
+
+
+class NearestRestaurantsSerializer(Serializer):
+    lat = FloatField(min_value=-90, max_value=90)
+    lon = FloatField(min_value=-180, max_value=180)
+    k = IntegerField(min_value=1, default=5)
+    max_km = FloatField(min_value=0, required=False)
+    products = ListField(
+        child=IntegerField(min_value=1),
+        required=False
+    )
+
+
+class MenuAvailabilitySerializer(Serializer):
+    restaurant = IntegerField(min_value=1)
+    product = IntegerField(min_value=1)
+    availability = BooleanField()
@@ -0,0 +1,20 @@
+from django.db import transaction
+
+from .catalogue import availability_matrix, banners, catalogue
+
+
+def invalidate_catalogue_cache(sender, **kwargs):
+    transaction.on_commit(catalogue.invalidate)
+
+
+def invalidate_banners_cache(sender, **kwargs):
+    transaction.on_commit(banners.invalidate)
+
+
+def invalidate_availability_matrix(sender, **kwargs):
+    transaction.on_commit(availability_matrix.invalidate)
+
+
+def invalidate_menu_caches(sender, **kwargs):
+    transaction.on_commit(catalogue.invalidate)
+    transaction.on_commit(availability_matrix.invalidate)
@@ -0,0 +1,131 @@
+import random
+from decimal import Decimal
+
+from django.db.models import Max
+
+from places.geo_index import restaurant_geo_index
+from places.geocoders import FakeGeocoder
+from places.utils import resolve_places
+
+from .models import (
+    Order,
+    Product,
+    ProductCategory,
+    Restaurant,
+    RestaurantMenuItem
+)
+
+STREETS = [
+    'Тверская', 'Арбат', 'Пятницкая', 'Мясницкая', 'Покровка',
+    'Сретенка', 'Петровка', 'Никольская', 'Маросейка', 'Остоженка',
+]
+
+
+def bulk_create_returning(model, objects):
+    last_id = model.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+    model.objects.bulk_create(objects, batch_size=500)
+    return list(model.objects.filter(id__gt=last_id).order_by('id'))
+
+
+def generate_address(randomizer):
+    street = randomizer.choice(STREETS)
+    return f'Москва, ул. {street}, д. {randomizer.randint(1, 200)}'
+
+
+def generate_catalogue(
+    restaurants=5,
+    products=20,
+    categories=4,
+    menu_coverage=0.8,
+    availability=0.9,
+    seed=0
+):
+    randomizer = random.Random(seed)
+    category_objects = bulk_create_returning(ProductCategory, [
+        ProductCategory(name=f'Категория {number}')
+        for number in range(1, categories + 1)
+    ])
+    product_objects = bulk_create_returning(Product, [
+        Product(
+            name=f'Товар {number}',
+            category=randomizer.choice(category_objects),
+            price=Decimal(randomizer.randrange(100, 1000)),
+            image='synthetic.jpg',
+            special_status=randomizer.random() < 0.1,
+        )
+        for number in range(1, products + 1)
+    ])
+    restaurant_objects = bulk_create_returning(Restaurant, [
+        Restaurant(
+            name=f'Ресторан {number}',
+            address=generate_address(randomizer),
+            contact_phone=f'+7 (900) 000-{number:04d}',
+        )
+        for number in range(1, restaurants + 1)
+    ])
+    RestaurantMenuItem.objects.bulk_create(
+        [
+            RestaurantMenuItem(
+                restaurant=restaurant,
+                product=product,
+                availability=randomizer.random() < availability,
+            )
+            for restaurant in restaurant_objects
+            for product in product_objects
+            if randomizer.random() < menu_coverage
+        ],
+        batch_size=500
+    )
+    return restaurant_objects, product_objects
+
+
+def generate_orders(products, orders=50, items_per_order=3, seed=0):
+    randomizer = random.Random(seed)
+    orders_fields = [
+        {
+            'firstname': f'Клиент {number}',
+            'lastname': 'Тестовый',
+            'phonenumber': f'+7916{number:07d}',
+            'address': generate_address(randomizer),
+            'status': randomizer.choice(['1', '1', '2', '3']),
+            'products': [
+                {'product': product, 'quantity': randomizer.randint(1, 5)}
+                for product in randomizer.sample(
+                    products,
+                    min(items_per_order, len(products))
+                )
+            ],
+        }
+        for number in range(1, orders + 1)
+    ]
+    return Order.objects.create_with_items(orders_fields)
+
+
+def generate_dataset(
+    restaurants=5,
+    products=20,
+    orders=50,
+    items_per_order=3,
+    menu_coverage=0.8,
+    seed=0,
+    geocoder=None
+):
+    restaurant_objects, product_objects = generate_catalogue(
+        restaurants=restaurants,
+        products=products,
+        menu_coverage=menu_coverage,
+        seed=seed
+    )
+    order_objects = generate_orders(
+        product_objects,
+        orders=orders,
+        items_per_order=items_per_order,
+        seed=seed
+    )
+    resolve_places(
+        [restaurant.address for restaurant in restaurant_objects]
+        + [order.address for order in order_objects],
+        geocoder=geocoder or FakeGeocoder()
+    )
+    restaurant_geo_index.invalidate()
+    return restaurant_objects, product_objects, order_objects
@@ -0,0 +1,81 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase
+
+from foodcartapp.intake import (
+    DONE,
+    PENDING,
+    PROCESSING,
+    OrderJournal,
+    drain_order_journal
+)
+from foodcartapp.models import Order
+from foodcartapp.synthetic import generate_catalogue
+
+
+class OrderJournalDrainTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _, cls.products = generate_catalogue(
+            restaurants=2,
+            products=3,
+            menu_coverage=1,
+            availability=1
+        )
+
+    def setUp(self):
+        journal_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(journal_dir.cleanup)
+        self.journal = OrderJournal(str(Path(journal_dir.name) / 'intake.db'))
+        self.tracking_id = self.journal.append({
+            'firstname': 'Иван',
+            'lastname': 'Петров',
+            'phonenumber': '+79161234567',
+            'address': 'Москва, ул. Тверская, д. 1',
+            'products': [{'product': self.products[0].id, 'quantity': 2}],
+        })
+
+    def get_status(self):
+        return self.journal.get(self.tracking_id)['status']
+
+    def test_failed_drain_releases_claimed_entries(self):
+        with mock.patch.object(
+            Order.objects,
+            'create_with_items',
+            side_effect=DatabaseError('connection lost')
+        ):
+            with self.assertRaises(DatabaseError):
+                drain_order_journal(self.journal, batch_size=10)
+
+        self.assertEqual(self.get_status(), PENDING)
+        self.assertEqual(drain_order_journal(self.journal, batch_size=10), 1)
+        self.assertEqual(
+            Order.objects.filter(tracking_id=self.tracking_id).count(),
+            1
+        )
+
+    def test_crashed_claim_is_requeued_and_drained_once(self):
+        self.journal.claim(10)
+        self.assertEqual(self.get_status(), PROCESSING)
+        self.assertEqual(drain_order_journal(self.journal, batch_size=10), 0)
+        self.assertEqual(self.journal.requeue_stale(older_than=0), 1)
+
+        with mock.patch.object(
+            OrderJournal,
+            'mark_done',
+            side_effect=OSError('disk full')
+        ):
+            with self.assertRaises(OSError):
+                drain_order_journal(self.journal, batch_size=10)
+        self.assertEqual(self.get_status(), PENDING)
+
+        self.assertEqual(drain_order_journal(self.journal, batch_size=10), 1)
+        order = Order.objects.get(tracking_id=self.tracking_id)
+        self.assertEqual(self.get_status(), DONE)
+        self.assertEqual(
+            self.journal.get(self.tracking_id)['order_id'],
+            order.id
+        )
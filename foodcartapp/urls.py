@@ -1,12 +1,34 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import product_list_api, banners_list_api, register_order
+from .views import (
+    abanners_list_api,
+    aproduct_list_api,
+    aregister_order,
+    banners_list_api,
+    nearest_restaurants_api,
+    order_intake_status,
+    product_list_api,
+    register_order,
+    register_orders_batch,
+    update_menu_availability
+)
 
 
 app_name = "foodcartapp"
 
 urlpatterns = [
-    path('products/', product_list_api),
-    path('banners/', banners_list_api),
-    path('order/', register_order),
+    path(
+        'products/',
+        aproduct_list_api if settings.ASYNC_API else product_list_api
+    ),
+    path(
+        'banners/',
+        abanners_list_api if settings.ASYNC_API else banners_list_api
+    ),
+    path('order/', aregister_order if settings.ASYNC_API else register_order),
+    path('order/intake/<str:tracking_id>/', order_intake_status),
+    path('orders/batch/', register_orders_batch),
+    path('restaurants/nearest/', nearest_restaurants_api),
+    path('menu/availability/', update_menu_availability),
 ]
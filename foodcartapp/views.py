@@ -1,113 +1,291 @@
-from django.http import JsonResponse
-from django.templatetags.static import static
-from rest_framework.decorators import api_view
-from rest_framework.response import Response
-from rest_framework.serializers import (
-    ListField,
-    ModelSerializer
+import json
+from calendar import timegm
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotAllowed
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.decorators import (
+    api_view,
+    parser_classes,
+    permission_classes
 )
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ParseError, ValidationError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 
+from .catalogue import banners, catalogue
+from .intake import get_order_journal
 from .models import (
     Order,
-    OrderItem,
-    Product
+    Product,
+    Restaurant,
+    RestaurantMenuItem,
+    find_common_restaurants
+)
+from .serializers import (
+    MenuAvailabilitySerializer,
+    NearestRestaurantsSerializer,
+    OrderSerializer,
+    get_order_serializer_context
 )
+from places.geo_index import restaurant_geo_index
+from star_burger.renderers import JsonResponse
+
+
+def build_payload_response(request, payload, **cache_control):
+    etag = quote_etag(payload['etag'])
+    last_modified = None
+    if payload.get('last_modified'):
+        last_modified = timegm(payload['last_modified'].utctimetuple())
+
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified
+    )
+    if response is None:
+        response = HttpResponse(
+            payload['body'],
+            content_type='application/json'
+        )
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, **cache_control)
+    return response
 
 
+@transaction.non_atomic_requests
 def banners_list_api(request):
-    # FIXME move data to db?
-    return JsonResponse([
-        {
-            'title': 'Burger',
-            'src': static('burger.jpg'),
-            'text': 'Tasty Burger at your door step',
-        },
-        {
-            'title': 'Spices',
-            'src': static('food.jpg'),
-            'text': 'All Cuisines',
-        },
-        {
-            'title': 'New York',
-            'src': static('tasty.jpg'),
-            'text': 'Food is incomplete without a tasty dessert',
-        }
-    ], safe=False, json_dumps_params={
-        'ensure_ascii': False,
-        'indent': 4,
-    })
+    return build_payload_response(
+        request,
+        banners.get(),
+        public=True,
+        max_age=settings.BANNERS_CACHE_MAX_AGE
+    )
+
 
+@transaction.non_atomic_requests
+async def abanners_list_api(request):
+    return build_payload_response(
+        request,
+        await sync_to_async(banners.get)(),
+        public=True,
+        max_age=settings.BANNERS_CACHE_MAX_AGE
+    )
 
+
+@transaction.non_atomic_requests
 def product_list_api(request):
-    products = Product.objects.select_related('category').available()
-
-    dumped_products = []
-    for product in products:
-        dumped_product = {
-            'id': product.id,
-            'name': product.name,
-            'price': product.price,
-            'special_status': product.special_status,
-            'description': product.description,
-            'category': {
-                'id': product.category.id,
-                'name': product.category.name,
-            } if product.category else None,
-            'image': product.image.url,
-            'restaurant': {
-                'id': product.id,
-                'name': product.name,
-            }
-        }
-        dumped_products.append(dumped_product)
-    return JsonResponse(dumped_products, safe=False, json_dumps_params={
-        'ensure_ascii': False,
-        'indent': 4,
-    })
+    return build_payload_response(request, catalogue.get(), no_cache=True)
+
+
+@transaction.non_atomic_requests
+async def aproduct_list_api(request):
+    return build_payload_response(
+        request,
+        await sync_to_async(catalogue.get)(),
+        no_cache=True
+    )
+
 
+class NDJSONParser(BaseParser):
+    media_type = 'application/x-ndjson'
 
-class OrderItemSerializer(ModelSerializer):
-    class Meta:
-        model = OrderItem
-        fields = ['product', 'quantity', 'cost']
+    def parse(self, stream, media_type=None, parser_context=None):
+        orders_payload = []
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                orders_payload.append(json.loads(line))
+            except ValueError as error:
+                raise ParseError(
+                    f'Ошибка разбора NDJSON в строке {line_number}: {error}'
+                )
+        return orders_payload
 
 
-class OrderSerializer(ModelSerializer):
-    products = ListField(
-        child=OrderItemSerializer(),
-        allow_empty=False,
-        write_only=True
+def accept_order(order_payload):
+    serializer = OrderSerializer(
+        data=order_payload,
+        context=get_order_serializer_context([order_payload])
     )
-    class Meta:
-        model = Order
-        fields = [
-            'id',  
-            'firstname',
-            'lastname',
-            'address',
-            'phonenumber',
-            'products'
-        ]
+    serializer.is_valid(raise_exception=True)
+
+    if settings.ORDER_INTAKE_MODE == 'async':
+        tracking_id = get_order_journal().append(order_payload)
+        return (
+            {'tracking_id': tracking_id, 'status': 'pending'},
+            status.HTTP_202_ACCEPTED
+        )
+
+    order, = Order.objects.create_with_items([serializer.validated_data])
+
+    serializer = OrderSerializer(order)
+
+    return serializer.data, status.HTTP_200_OK
 
 
 @api_view(['POST'])
 def register_order(request):
-    serializer = OrderSerializer(data=request.data)
+    order_data, response_status = accept_order(request.data)
+    return Response(order_data, status=response_status)
+
+
+@transaction.non_atomic_requests
+async def aregister_order(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        order_payload = json.loads(request.body)
+    except ValueError as error:
+        return JsonResponse(
+            {'detail': f'JSON parse error - {error}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        order_data, response_status = await sync_to_async(
+            transaction.atomic(accept_order)
+        )(order_payload)
+    except ValidationError as error:
+        return JsonResponse(
+            error.detail,
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return JsonResponse(order_data, status=response_status)
+
+
+aregister_order.csrf_exempt = True
+
+
+@api_view(['GET'])
+def order_intake_status(request, tracking_id):
+    entry = get_order_journal().get(tracking_id)
+    if not entry:
+        raise NotFound()
+    return Response(entry)
+
+
+@api_view(['POST'])
+@parser_classes([JSONParser, NDJSONParser])
+def register_orders_batch(request):
+    orders_payload = request.data
+    if not isinstance(orders_payload, list):
+        raise ValidationError('Ожидается список заказов.')
+    if len(orders_payload) > settings.ORDERS_BATCH_MAX_SIZE:
+        raise ValidationError(
+            f'Не больше {settings.ORDERS_BATCH_MAX_SIZE} заказов за раз.'
+        )
+
+    serializer_context = get_order_serializer_context(orders_payload)
+    results = []
+    valid_orders_fields = []
+    valid_results = []
+    for index, order_payload in enumerate(orders_payload):
+        serializer = OrderSerializer(
+            data=order_payload,
+            context=serializer_context
+        )
+        if serializer.is_valid():
+            result = {'index': index, 'status': 'created'}
+            valid_orders_fields.append(serializer.validated_data)
+            valid_results.append(result)
+        else:
+            result = {
+                'index': index,
+                'status': 'invalid',
+                'errors': serializer.errors,
+            }
+        results.append(result)
+
+    orders = Order.objects.create_with_items(valid_orders_fields)
+    for result, order in zip(valid_results, orders):
+        result['id'] = order.id
+
+    return Response(results)
+
+
+@api_view(['GET'])
+def nearest_restaurants_api(request):
+    serializer = NearestRestaurantsSerializer(data=request.query_params)
     serializer.is_valid(raise_exception=True)
+    params = serializer.validated_data
 
-    order = Order.objects.create(
-        firstname=serializer.validated_data['firstname'],
-        lastname=serializer.validated_data['lastname'],
-        address=serializer.validated_data['address'],
-        phonenumber=serializer.validated_data['phonenumber'],
+    restaurant_ids = None
+    if params.get('products'):
+        restaurants_by_product = (
+            RestaurantMenuItem.objects
+            .filter(product__in=params['products'])
+            .get_restaurants_by_product()
+        )
+        restaurant_ids = find_common_restaurants(
+            restaurants_by_product,
+            params['products']
+        )
+
+    nearest_restaurants = restaurant_geo_index.nearest(
+        params['lat'],
+        params['lon'],
+        k=params['k'],
+        max_km=params.get('max_km'),
+        restaurant_ids=restaurant_ids
+    )
+    restaurants = Restaurant.objects.in_bulk(
+        [restaurant_id for restaurant_id, _ in nearest_restaurants]
     )
 
-    products_fields = serializer.validated_data['products']
-    for product in products_fields:
-        product['cost'] = product['product'].price * product['quantity']
-    products = [OrderItem(order=order, **fields) for fields in products_fields]
-    OrderItem.objects.bulk_create(products)
+    return Response([
+        {
+            'id': restaurant_id,
+            'name': restaurants[restaurant_id].name,
+            'address': restaurants[restaurant_id].address,
+            'distance': km,
+        }
+        for restaurant_id, km in nearest_restaurants
+        if restaurant_id in restaurants
+    ])
 
-    serializer = OrderSerializer(order)
 
-    return Response(serializer.data)
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def update_menu_availability(request):
+    serializer = MenuAvailabilitySerializer(data=request.data, many=True)
+    serializer.is_valid(raise_exception=True)
+    changes = serializer.validated_data
+
+    restaurant_ids = {change['restaurant'] for change in changes}
+    product_ids = {change['product'] for change in changes}
+    unknown_restaurants = restaurant_ids - set(
+        Restaurant.objects
+        .filter(id__in=restaurant_ids)
+        .values_list('id', flat=True)
+    )
+    unknown_products = product_ids - set(
+        Product.objects
+        .filter(id__in=product_ids)
+        .values_list('id', flat=True)
+    )
+    errors = {}
+    if unknown_restaurants:
+        restaurant_ids = ', '.join(map(str, sorted(unknown_restaurants)))
+        errors['restaurants'] = f'Рестораны не найдены: {restaurant_ids}.'
+    if unknown_products:
+        product_ids = ', '.join(map(str, sorted(unknown_products)))
+        errors['products'] = f'Товары не найдены: {product_ids}.'
+    if errors:
+        raise ValidationError(errors)
+
+    updated, created = RestaurantMenuItem.objects.set_availability(
+        (change['restaurant'], change['product'], change['availability'])
+        for change in changes
+    )
+    return Response({'updated': updated, 'created': created})
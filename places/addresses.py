@@ -0,0 +1,32 @@
+import re
+
+
+ABBREVIATIONS = {
+    'г': 'город',
+    'ул': 'улица',
+    'пр': 'проспект',
+    'пр-т': 'проспект',
+    'просп': 'проспект',
+    'пер': 'переулок',
+    'пл': 'площадь',
+    'ш': 'шоссе',
+    'наб': 'набережная',
+    'б-р': 'бульвар',
+    'бул': 'бульвар',
+    'пр-д': 'проезд',
+    'туп': 'тупик',
+    'мкр': 'микрорайон',
+    'д': 'дом',
+    'к': 'корпус',
+    'корп': 'корпус',
+    'стр': 'строение',
+}
+OMITTED_WORDS = {'город', 'дом'}
+
+TOKEN_PATTERN = re.compile(r'[а-яa-z]+(?:-[а-яa-z]+)*|\d+[а-яa-z]?')
+
+
+def normalize_address(address):
+    tokens = TOKEN_PATTERN.findall(address.lower().replace('ё', 'е'))
+    words = (ABBREVIATIONS.get(token, token) for token in tokens)
+    return ' '.join(word for word in words if word not in OMITTED_WORDS)
@@ -1,6 +1,35 @@
 from django.apps import AppConfig
+from django.db import DatabaseError
+from django.db.models.signals import post_delete, post_save, pre_save
+from loguru import logger
 
 
 class PlacesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'places'
+
+    def ready(self):
+        from places import signals
+        from places.geo_index import restaurant_geo_index
+
+        Restaurant = self.apps.get_model('foodcartapp', 'Restaurant')
+        Place = self.get_model('Place')
+        pre_save.connect(
+            signals.remember_restaurant_address,
+            sender=Restaurant
+        )
+        post_save.connect(signals.geocode_restaurant, sender=Restaurant)
+        post_delete.connect(
+            signals.invalidate_restaurant_geo_index,
+            sender=Restaurant
+        )
+        post_save.connect(signals.invalidate_restaurant_geo_index, sender=Place)
+        post_delete.connect(
+            signals.invalidate_restaurant_geo_index,
+            sender=Place
+        )
+
+        try:
+            restaurant_geo_index.load()
+        except DatabaseError:
+            logger.warning('Индекс координат ресторанов не загружен')
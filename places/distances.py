@@ -0,0 +1,73 @@
+from operator import itemgetter
+
+import numpy as np
+from geopy import distance
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _to_radians(coordinates):
+    return np.radians(np.asarray(coordinates, dtype=float).reshape(-1, 2))
+
+
+def haversine_matrix(origins, destinations):
+    origins = _to_radians(origins)
+    destinations = _to_radians(destinations)
+    origin_lats = origins[:, 0, np.newaxis]
+    origin_lons = origins[:, 1, np.newaxis]
+    destination_lats = destinations[np.newaxis, :, 0]
+    destination_lons = destinations[np.newaxis, :, 1]
+
+    half_chord = (
+        np.sin((destination_lats - origin_lats) / 2) ** 2
+        + np.cos(origin_lats) * np.cos(destination_lats)
+        * np.sin((destination_lons - origin_lons) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(half_chord, 0, 1)))
+
+
+def equirectangular_matrix(origins, destinations):
+    origins = _to_radians(origins)
+    destinations = _to_radians(destinations)
+    origin_lats = origins[:, 0, np.newaxis]
+    origin_lons = origins[:, 1, np.newaxis]
+    destination_lats = destinations[np.newaxis, :, 0]
+    destination_lons = destinations[np.newaxis, :, 1]
+
+    x = (
+        (destination_lons - origin_lons)
+        * np.cos((origin_lats + destination_lats) / 2)
+    )
+    y = destination_lats - origin_lats
+    return EARTH_RADIUS_KM * np.hypot(x, y)
+
+
+def geodesic_matrix(origins, destinations):
+    return np.array([
+        [
+            distance.distance(origin, destination).km
+            for destination in destinations
+        ]
+        for origin in origins
+    ], dtype=float).reshape(len(origins), len(destinations))
+
+
+DISTANCE_METHODS = {
+    'haversine': haversine_matrix,
+    'equirectangular': equirectangular_matrix,
+    'geodesic': geodesic_matrix,
+}
+
+
+def build_distance_matrix(origins, destinations, method='haversine'):
+    if not len(origins) or not len(destinations):
+        return np.zeros((len(origins), len(destinations)))
+    return DISTANCE_METHODS[method](origins, destinations)
+
+
+def rank_candidates(distances_row, candidates):
+    ranked_candidates = [
+        [candidate, round(float(distances_row[column]), 3)]
+        for candidate, column in candidates
+    ]
+    return sorted(ranked_candidates, key=itemgetter(1))
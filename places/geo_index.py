@@ -0,0 +1,102 @@
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import Signal
+
+from places.addresses import normalize_address
+from places.models import Place
+from places.spatial import KDTree
+
+INDEX_VERSION_KEY = 'places:restaurant-geo-index:version'
+
+restaurant_coordinates_changed = Signal()
+
+
+class RestaurantGeoIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._coordinates = None
+        self._tree = None
+        self._version = None
+        self._loaded_at = None
+
+    def _get_shared_version(self):
+        return cache.get_or_set(INDEX_VERSION_KEY, 1, timeout=None)
+
+    def load(self):
+        Restaurant = apps.get_model('foodcartapp', 'Restaurant')
+        with self._lock:
+            version = self._get_shared_version()
+            restaurant_addresses = dict(
+                Restaurant.objects
+                .exclude(address='')
+                .values_list('id', 'address')
+            )
+            normalized_addresses = {
+                restaurant_id: normalize_address(address)
+                for restaurant_id, address in restaurant_addresses.items()
+            }
+            places = {
+                place.normalized_address: place
+                for place in Place.objects.filter(
+                    normalized_address__in=set(normalized_addresses.values()),
+                    lattitude__isnull=False,
+                    longitude__isnull=False,
+                )
+            }
+            self._coordinates = {
+                restaurant_id: (
+                    places[address].lattitude,
+                    places[address].longitude
+                )
+                for restaurant_id, address in normalized_addresses.items()
+                if address in places
+            }
+            self._tree = KDTree(self._coordinates)
+            self._version = version
+            self._loaded_at = time.monotonic()
+        return self._coordinates
+
+    def invalidate(self):
+        try:
+            cache.incr(INDEX_VERSION_KEY)
+        except ValueError:
+            cache.set(INDEX_VERSION_KEY, 1, timeout=None)
+        self._coordinates = None
+
+    def reload(self, previous_coordinates):
+        self.invalidate()
+        coordinates = self.get_coordinates()
+        if coordinates != previous_coordinates:
+            restaurant_coordinates_changed.send(sender=self.__class__)
+        return coordinates
+
+    def get_coordinates(self):
+        coordinates = self._coordinates
+        if (
+            coordinates is None
+            or self._version != self._get_shared_version()
+            or time.monotonic() - self._loaded_at
+            > settings.CACHE_PAYLOAD_TIMEOUT
+        ):
+            coordinates = self.load()
+        return coordinates
+
+    def get(self, restaurant_id):
+        return self.get_coordinates().get(restaurant_id)
+
+    def nearest(self, lat, lon, k=None, max_km=None, restaurant_ids=None):
+        self.get_coordinates()
+        return self._tree.nearest(
+            lat,
+            lon,
+            k=k,
+            max_km=max_km,
+            keys=restaurant_ids
+        )
+
+
+restaurant_geo_index = RestaurantGeoIndex()
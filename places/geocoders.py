@@ -0,0 +1,300 @@
+import asyncio
+import hashlib
+import random
+import threading
+import time
+import weakref
+from functools import lru_cache
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from star_burger.metrics import track
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class GeocoderUnavailable(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class BaseGeocoder:
+    def __init__(self, apikey=None, max_concurrency=10, total_timeout=None):
+        self.apikey = apikey
+        self.max_concurrency = max_concurrency
+        self.total_timeout = total_timeout
+
+    def geocode(self, address):
+        raise NotImplementedError
+
+    def geocode_many(self, addresses):
+        with track('geocoder', count=len(addresses)):
+            return self.geocode_addresses(addresses)
+
+    def geocode_addresses(self, addresses):
+        coordinates = {}
+        started_at = time.monotonic()
+        for address in addresses:
+            if (
+                self.total_timeout is not None
+                and time.monotonic() - started_at >= self.total_timeout
+            ):
+                logger.warning(
+                    'Геокодер отвечает слишком долго, запросы пропущены'
+                )
+                break
+            try:
+                found_coordinates = self.geocode(address)
+            except GeocoderUnavailable:
+                logger.warning('Геокодер недоступен, запросы пропущены')
+                break
+            except requests.exceptions.RequestException:
+                logger.exception("Ошибка HTTP запроса:")
+                continue
+            except Exception:
+                logger.exception("Непредвиденная ошибка:")
+                continue
+            coordinates[address] = found_coordinates
+        return coordinates
+
+    async def ageocode_many(self, addresses):
+        return await sync_to_async(
+            self.geocode_many,
+            thread_sensitive=False
+        )(addresses)
+
+
+class HTTPGeocoder(BaseGeocoder):
+    base_url = None
+
+    def __init__(
+        self,
+        timeout=5,
+        retries=2,
+        backoff=0.3,
+        failure_threshold=5,
+        reset_timeout=30,
+        **options
+    ):
+        super().__init__(**options)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=failure_threshold,
+            reset_timeout=reset_timeout
+        )
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.max_concurrency
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.async_clients = weakref.WeakKeyDictionary()
+        self.async_clients_lock = threading.Lock()
+
+    def get_params(self, address):
+        raise NotImplementedError
+
+    def parse_response(self, response_json):
+        raise NotImplementedError
+
+    def get_async_client(self):
+        loop = asyncio.get_running_loop()
+        with self.async_clients_lock:
+            if loop not in self.async_clients:
+                self.async_clients[loop] = (
+                    httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=self.max_concurrency
+                        ),
+                        timeout=self.timeout
+                    ),
+                    asyncio.Semaphore(self.max_concurrency),
+                )
+            return self.async_clients[loop]
+
+    def get_retry_delay(self, attempt):
+        return self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+
+    def geocode(self, address):
+        if not self.circuit_breaker.allow():
+            raise GeocoderUnavailable(self.base_url)
+
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.get(
+                    self.base_url,
+                    params=self.get_params(address),
+                    timeout=self.timeout
+                )
+                if response.status_code not in RETRY_STATUSES:
+                    break
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    self.circuit_breaker.record_failure()
+                    raise
+            if attempt < self.retries:
+                time.sleep(self.get_retry_delay(attempt))
+
+        if response.status_code in RETRY_STATUSES:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        response.raise_for_status()
+        return self.parse_response(response.json())
+
+    async def ageocode(self, client, semaphore, address):
+        if not self.circuit_breaker.allow():
+            return None
+
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    response = await client.get(
+                        self.base_url,
+                        params=self.get_params(address)
+                    )
+                    if response.status_code not in RETRY_STATUSES:
+                        break
+                except httpx.TransportError:
+                    if attempt == self.retries:
+                        self.circuit_breaker.record_failure()
+                        logger.exception("Ошибка HTTP запроса:")
+                        return None
+                if attempt < self.retries:
+                    await asyncio.sleep(self.get_retry_delay(attempt))
+
+        if response.status_code in RETRY_STATUSES:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        try:
+            response.raise_for_status()
+            return address, self.parse_response(response.json())
+        except httpx.HTTPError:
+            logger.exception("Ошибка HTTP запроса:")
+        except Exception:
+            logger.exception("Непредвиденная ошибка:")
+        return None
+
+    async def ageocode_many(self, addresses):
+        if not addresses:
+            return {}
+        client, semaphore = self.get_async_client()
+        with track('geocoder', count=len(addresses)):
+            tasks = [
+                asyncio.ensure_future(
+                    self.ageocode(client, semaphore, address)
+                )
+                for address in addresses
+            ]
+            done, pending = await asyncio.wait(
+                tasks,
+                timeout=self.total_timeout
+            )
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(
+                    'Геокодер отвечает слишком долго, запросы пропущены'
+                )
+        return dict(task.result() for task in done if task.result())
+
+
+class YandexGeocoder(HTTPGeocoder):
+    base_url = 'https://geocode-maps.yandex.ru/1.x'
+
+    def get_params(self, address):
+        return {
+            'geocode': address,
+            'apikey': self.apikey,
+            'format': 'json',
+        }
+
+    def parse_response(self, response_json):
+        found_places = (
+            response_json['response']['GeoObjectCollection']['featureMember']
+        )
+
+        if not found_places:
+            return None
+
+        most_relevant = found_places[0]
+        lon, lat = most_relevant['GeoObject']['Point']['pos'].split(' ')
+        return float(lat), float(lon)
+
+
+class FakeGeocoder(BaseGeocoder):
+    def __init__(
+        self,
+        places=None,
+        center=(55.751244, 37.618423),
+        spread=0.2,
+        apikey=None,
+        max_concurrency=10,
+        total_timeout=None,
+        **http_options
+    ):
+        super().__init__(
+            apikey=apikey,
+            max_concurrency=max_concurrency,
+            total_timeout=total_timeout
+        )
+        self.places = places or {}
+        self.center = center
+        self.spread = spread
+        self.calls = 0
+
+    def geocode(self, address):
+        self.calls += 1
+        if address in self.places:
+            return self.places[address]
+        digest = hashlib.md5(address.encode()).digest()
+        lat_shift = digest[0] / 255 - 0.5
+        lon_shift = digest[1] / 255 - 0.5
+        return (
+            round(self.center[0] + lat_shift * self.spread, 6),
+            round(self.center[1] + lon_shift * self.spread, 6),
+        )
+
+
+@lru_cache(maxsize=None)
+def get_geocoder():
+    geocoder_class = import_string(settings.GEOCODER['BACKEND'])
+    return geocoder_class(**settings.GEOCODER.get('OPTIONS', {}))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from foodcartapp.models import Restaurant
+from places.geo_index import restaurant_geo_index
+from places.utils import resolve_places
+
+
+class Command(BaseCommand):
+    help = 'Геокодирует адреса ресторанов и обновляет индекс их координат'
+
+    def handle(self, *args, **options):
+        previous_coordinates = restaurant_geo_index.get_coordinates()
+        addresses = Restaurant.objects.values_list('address', flat=True)
+        places = resolve_places(addresses)
+        located_restaurants = len(
+            restaurant_geo_index.reload(previous_coordinates)
+        )
+        self.stdout.write(
+            f'Адресов: {len(places)}, ресторанов с координатами: '
+            f'{located_restaurants}'
+        )
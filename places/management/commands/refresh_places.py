@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from places.geo_index import restaurant_geo_index
+from places.geocoders import get_geocoder
+from places.models import Place
+from places.utils import save_geocoding_results
+
+
+class Command(BaseCommand):
+    help = 'Повторно геокодирует устаревшие и ненайденные адреса'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=500,
+            help='Сколько адресов обновить за один запуск',
+        )
+
+    def handle(self, *args, **options):
+        places = {
+            place.normalized_address: place
+            for place in (
+                Place.objects.stale()
+                .order_by('geodata_update_date')[:options['limit']]
+            )
+        }
+        if not places:
+            self.stdout.write('Устаревших адресов нет')
+            return
+
+        previous_coordinates = restaurant_geo_index.get_coordinates()
+        addresses = [place.address for place in places.values()]
+        found_coordinates = get_geocoder().geocode_many(addresses)
+        save_geocoding_results(addresses, found_coordinates, places)
+        restaurant_geo_index.reload(previous_coordinates)
+
+        found = sum(
+            1 for coordinates in found_coordinates.values() if coordinates
+        )
+        self.stdout.write(
+            f'Адресов: {len(addresses)}, найдено: {found}, '
+            f'не найдено: {len(found_coordinates) - found}, '
+            f'ошибок: {len(addresses) - len(found_coordinates)}'
+        )
@@ -0,0 +1,33 @@
+# Generated by Django 3.2 on 2026-10-17 04:39
+
+from django.db import migrations, models
+
+
+def mark_not_found_places(apps, schema_editor):
+    Place = apps.get_model('places', 'Place')
+    Place.objects.filter(lattitude__isnull=True).update(
+        lookup_status='not_found'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='lookup_status',
+            field=models.CharField(choices=[('found', 'Найдено'), ('not_found', 'Не найдено'), ('failed', 'Ошибка геокодера')], default='found', max_length=10, verbose_name='результат геокодирования'),
+        ),
+        migrations.RunPython(
+            mark_not_found_places,
+            migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['lookup_status', 'geodata_update_date'], name='place_lookup_status_date_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2 on 2026-10-17 05:02
+
+from django.db import migrations, models
+
+from places.addresses import normalize_address
+
+
+def fill_normalized_addresses(apps, schema_editor):
+    Place = apps.get_model('places', 'Place')
+    places = list(Place.objects.only('id', 'address'))
+    for place in places:
+        place.normalized_address = normalize_address(place.address)
+    Place.objects.bulk_update(places, ['normalized_address'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0002_place_lookup_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='normalized_address',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=255, verbose_name='нормализованный адрес'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(
+            fill_normalized_addresses,
+            migrations.RunPython.noop
+        ),
+    ]
@@ -1,13 +1,63 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from places.addresses import normalize_address
+
+
+class PlaceQuerySet(models.QuerySet):
+    def expired(self):
+        now = timezone.now()
+        return self.filter(
+            Q(
+                lookup_status=Place.NOT_FOUND,
+                geodata_update_date__lt=now - timedelta(
+                    seconds=settings.PLACE_NOT_FOUND_TTL
+                ),
+            )
+            | Q(
+                lookup_status=Place.FAILED,
+                geodata_update_date__lt=now - timedelta(
+                    seconds=settings.PLACE_FAILED_TTL
+                ),
+            )
+        )
+
+    def stale(self):
+        refresh_before = timezone.now() - timedelta(
+            seconds=settings.PLACE_REFRESH_AFTER
+        )
+        return self.filter(
+            Q(lookup_status=Place.FOUND, geodata_update_date__lt=refresh_before)
+            | Q(pk__in=self.expired().values('pk'))
+        )
 
 
 class Place(models.Model):
+    FOUND = 'found'
+    NOT_FOUND = 'not_found'
+    FAILED = 'failed'
+    LOOKUP_STATUSES = [
+        (FOUND, 'Найдено'),
+        (NOT_FOUND, 'Не найдено'),
+        (FAILED, 'Ошибка геокодера'),
+    ]
+
     address = models.CharField(
         'адрес места',
         max_length=255,
         unique=True,
         db_index=True,
     )
+    normalized_address = models.CharField(
+        'нормализованный адрес',
+        max_length=255,
+        db_index=True,
+        editable=False,
+    )
     longitude = models.FloatField(
         'долгота',
         blank=True,
@@ -23,10 +73,38 @@ class Place(models.Model):
         db_index=True,
         auto_now=True,
     )
+    lookup_status = models.CharField(
+        'результат геокодирования',
+        max_length=10,
+        choices=LOOKUP_STATUSES,
+        default=FOUND,
+    )
+
+    objects = PlaceQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'место'
         verbose_name_plural = 'места'
+        indexes = [
+            models.Index(
+                fields=['lookup_status', 'geodata_update_date'],
+                name='place_lookup_status_date_idx'
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.normalized_address = normalize_address(self.address)
+        super().save(*args, **kwargs)
+
+    def is_expired(self):
+        ttl = {
+            self.NOT_FOUND: settings.PLACE_NOT_FOUND_TTL,
+            self.FAILED: settings.PLACE_FAILED_TTL,
+        }.get(self.lookup_status)
+        if ttl is None:
+            return False
+        expires_at = self.geodata_update_date + timedelta(seconds=ttl)
+        return expires_at < timezone.now()
 
     def __str__(self):
         return f'{self.id} {self.address}'
\ No newline at end of file
@@ -0,0 +1,28 @@
+from django.db import transaction
+
+from places.geo_index import restaurant_geo_index
+from places.utils import resolve_places
+
+
+def remember_restaurant_address(sender, instance, **kwargs):
+    instance.previous_address = None
+    if instance.pk:
+        instance.previous_address = (
+            sender.objects
+            .filter(pk=instance.pk)
+            .values_list('address', flat=True)
+            .first()
+        )
+
+
+def geocode_restaurant(sender, instance, **kwargs):
+    address = instance.address
+    if address == getattr(instance, 'previous_address', None):
+        return
+    if address:
+        transaction.on_commit(lambda: resolve_places([address]))
+    transaction.on_commit(restaurant_geo_index.invalidate)
+
+
+def invalidate_restaurant_geo_index(sender, **kwargs):
+    transaction.on_commit(restaurant_geo_index.invalidate)
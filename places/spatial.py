@@ -0,0 +1,96 @@
+import heapq
+import math
+
+from places.distances import EARTH_RADIUS_KM
+
+
+def to_unit_vector(lat, lon):
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (
+        math.cos(lat) * math.cos(lon),
+        math.cos(lat) * math.sin(lon),
+        math.sin(lat),
+    )
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1))
+
+
+def km_to_chord(km):
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+class KDNode:
+    __slots__ = ('point', 'key', 'axis', 'left', 'right')
+
+    def __init__(self, point, key, axis, left, right):
+        self.point = point
+        self.key = key
+        self.axis = axis
+        self.left = left
+        self.right = right
+
+
+class KDTree:
+    def __init__(self, coordinates):
+        points = [
+            (to_unit_vector(lat, lon), key)
+            for key, (lat, lon) in coordinates.items()
+        ]
+        self.size = len(points)
+        self.root = self._build(points, depth=0)
+
+    def _build(self, points, depth):
+        if not points:
+            return None
+        axis = depth % 3
+        points.sort(key=lambda point: point[0][axis])
+        median = len(points) // 2
+        point, key = points[median]
+        return KDNode(
+            point=point,
+            key=key,
+            axis=axis,
+            left=self._build(points[:median], depth + 1),
+            right=self._build(points[median + 1:], depth + 1),
+        )
+
+    def nearest(self, lat, lon, k=None, max_km=None, keys=None):
+        if keys is not None:
+            keys = set(keys)
+            if not keys:
+                return []
+        limit = k or self.size
+        max_chord = km_to_chord(max_km) if max_km is not None else math.inf
+        target = to_unit_vector(lat, lon)
+        found = []
+
+        def search_radius():
+            if len(found) < limit:
+                return max_chord
+            return min(max_chord, -found[0][0])
+
+        def visit(node):
+            if node is None:
+                return
+            if keys is None or node.key in keys:
+                chord = math.dist(target, node.point)
+                if chord <= search_radius():
+                    heapq.heappush(found, (-chord, node.key))
+                    if len(found) > limit:
+                        heapq.heappop(found)
+            offset = target[node.axis] - node.point[node.axis]
+            near, far = (
+                (node.left, node.right) if offset < 0
+                else (node.right, node.left)
+            )
+            visit(near)
+            if abs(offset) <= search_radius():
+                visit(far)
+
+        visit(self.root)
+        return [
+            (key, round(chord_to_km(-negative_chord), 3))
+            for negative_chord, key in sorted(found, reverse=True)
+        ]
@@ -0,0 +1,310 @@
+import json
+import random
+import time
+from datetime import timedelta
+
+import requests
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from places.addresses import normalize_address
+from places.distances import haversine_matrix
+from places.geocoders import (
+    CircuitBreaker,
+    FakeGeocoder,
+    GeocoderUnavailable,
+    HTTPGeocoder
+)
+from places.models import Place
+from places.spatial import KDTree
+from places.utils import resolve_places, save_geocoding_results
+
+
+def make_response(status_code, payload=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload or {}).encode()
+    response.url = StubHTTPGeocoder.base_url
+    return response
+
+
+class StubSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class StubHTTPGeocoder(HTTPGeocoder):
+    base_url = 'https://geocoder.test/'
+
+    def __init__(self, responses, **options):
+        super().__init__(backoff=0, **options)
+        self.session = StubSession(responses)
+
+    def get_params(self, address):
+        return {'geocode': address}
+
+    def parse_response(self, response_json):
+        return tuple(response_json['coordinates'])
+
+
+class FailingGeocoder(FakeGeocoder):
+    def geocode(self, address):
+        self.calls += 1
+        raise GeocoderUnavailable(address)
+
+
+class SlowGeocoder(FakeGeocoder):
+    def geocode(self, address):
+        time.sleep(0.05)
+        return super().geocode(address)
+
+
+class CircuitBreakerTest(SimpleTestCase):
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+    def test_lets_one_probe_through_after_reset_timeout(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        breaker.opened_at -= 30
+
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+        breaker.record_success()
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.failures, 0)
+
+
+class HTTPGeocoderTest(SimpleTestCase):
+    def test_retries_server_errors(self):
+        geocoder = StubHTTPGeocoder([
+            make_response(503),
+            make_response(200, {'coordinates': [55.7, 37.6]}),
+        ])
+
+        self.assertEqual(geocoder.geocode('Москва'), (55.7, 37.6))
+        self.assertEqual(geocoder.session.calls, 2)
+        self.assertEqual(geocoder.circuit_breaker.failures, 0)
+
+    def test_does_not_retry_client_errors(self):
+        geocoder = StubHTTPGeocoder([make_response(403)], retries=2)
+
+        with self.assertRaises(requests.HTTPError):
+            geocoder.geocode('Москва')
+        self.assertEqual(geocoder.session.calls, 1)
+        self.assertEqual(geocoder.circuit_breaker.failures, 0)
+
+    def test_records_failure_when_retries_are_exhausted(self):
+        geocoder = StubHTTPGeocoder(
+            [requests.ConnectionError(), requests.ConnectionError()],
+            retries=1
+        )
+
+        with self.assertRaises(requests.ConnectionError):
+            geocoder.geocode('Москва')
+        self.assertEqual(geocoder.session.calls, 2)
+        self.assertEqual(geocoder.circuit_breaker.failures, 1)
+
+    def test_open_breaker_skips_requests(self):
+        geocoder = StubHTTPGeocoder(
+            [make_response(503), make_response(503)],
+            retries=0,
+            failure_threshold=2
+        )
+
+        coordinates = geocoder.geocode_many(['Москва', 'Тверь', 'Казань'])
+
+        self.assertEqual(coordinates, {})
+        self.assertEqual(geocoder.session.calls, 2)
+        with self.assertRaises(GeocoderUnavailable):
+            geocoder.geocode('Москва')
+
+
+class PlaceLookupStatusTest(TestCase):
+    address = 'Москва, ул. Тверская, д. 1'
+
+    def test_not_found_address_is_remembered(self):
+        geocoder = FakeGeocoder(places={self.address: None})
+
+        place = resolve_places([self.address], geocoder=geocoder)[self.address]
+        resolve_places([self.address], geocoder=geocoder)
+
+        self.assertEqual(place.lookup_status, Place.NOT_FOUND)
+        self.assertIsNone(place.lattitude)
+        self.assertEqual(geocoder.calls, 1)
+
+    @override_settings(PLACE_FAILED_TTL=60)
+    def test_failed_lookup_is_retried_after_ttl(self):
+        geocoder = FailingGeocoder()
+
+        place = resolve_places([self.address], geocoder=geocoder)[self.address]
+        resolve_places([self.address], geocoder=geocoder)
+        self.assertEqual(place.lookup_status, Place.FAILED)
+        self.assertEqual(geocoder.calls, 1)
+
+        Place.objects.filter(address=self.address).update(
+            geodata_update_date=timezone.now() - timedelta(seconds=61)
+        )
+        resolve_places([self.address], geocoder=geocoder)
+        self.assertEqual(geocoder.calls, 2)
+
+    def test_slow_geocoder_leaves_rest_of_batch_failed(self):
+        geocoder = SlowGeocoder(total_timeout=0.08)
+        addresses = [f'Москва, ул. Арбат, д. {number}' for number in range(5)]
+
+        resolve_places(addresses, geocoder=geocoder)
+
+        self.assertGreaterEqual(geocoder.calls, 1)
+        self.assertLess(geocoder.calls, len(addresses))
+        self.assertEqual(
+            Place.objects.filter(lookup_status=Place.FOUND).count(),
+            geocoder.calls
+        )
+        self.assertEqual(
+            Place.objects.filter(lookup_status=Place.FAILED).count(),
+            len(addresses) - geocoder.calls
+        )
+
+    def test_address_spellings_share_one_place(self):
+        geocoder = FakeGeocoder()
+
+        places = resolve_places(
+            ['Москва, Тверская 1', 'москва тверская, д.1'],
+            geocoder=geocoder
+        )
+        resolve_places(['г. Москва, Тверская, дом 1'], geocoder=geocoder)
+
+        self.assertEqual(geocoder.calls, 1)
+        self.assertEqual(Place.objects.count(), 1)
+        self.assertEqual(
+            places['Москва, Тверская 1'].normalized_address,
+            places['москва тверская, д.1'].normalized_address
+        )
+
+    def test_stale_place_is_kept_on_failure(self):
+        place = Place.objects.create(
+            address=self.address,
+            lattitude=55.7,
+            longitude=37.6
+        )
+
+        save_geocoding_results(
+            [self.address],
+            {},
+            {place.normalized_address: place}
+        )
+
+        place.refresh_from_db()
+        self.assertEqual(place.lookup_status, Place.FOUND)
+        self.assertEqual((place.lattitude, place.longitude), (55.7, 37.6))
+
+
+class NormalizeAddressTest(SimpleTestCase):
+    def test_spellings_of_one_address_match(self):
+        self.assertEqual(
+            normalize_address('Москва, Тверская 1'),
+            normalize_address('москва тверская, д.1')
+        )
+        self.assertEqual(
+            normalize_address('москва тверская, д.1'),
+            'москва тверская 1'
+        )
+
+    def test_expands_abbreviations(self):
+        self.assertEqual(
+            normalize_address('г. Москва, пр-т Мира, д. 5, корп. 2, стр. 1'),
+            'москва проспект мира 5 корпус 2 строение 1'
+        )
+        self.assertEqual(
+            normalize_address('Москва, ул. Арбат, 10'),
+            normalize_address('Москва, улица Арбат, дом 10')
+        )
+        self.assertEqual(
+            normalize_address('Москва, Пречистенская наб., 17'),
+            'москва пречистенская набережная 17'
+        )
+
+    def test_replaces_yo(self):
+        self.assertEqual(
+            normalize_address('Москва, ул. Зелёная, 3'),
+            normalize_address('москва, ул. Зеленая, 3')
+        )
+
+
+class KDTreeTest(SimpleTestCase):
+    def setUp(self):
+        randomizer = random.Random(0)
+        self.coordinates = {
+            key: (
+                55.75 + randomizer.uniform(-0.3, 0.3),
+                37.62 + randomizer.uniform(-0.5, 0.5),
+            )
+            for key in range(200)
+        }
+        self.tree = KDTree(self.coordinates)
+        self.targets = [
+            (
+                55.75 + randomizer.uniform(-0.4, 0.4),
+                37.62 + randomizer.uniform(-0.6, 0.6),
+            )
+            for _ in range(20)
+        ]
+
+    def brute_force(self, lat, lon, k=None, max_km=None, keys=None):
+        candidates = [
+            key for key in self.coordinates if keys is None or key in keys
+        ]
+        if not candidates:
+            return []
+        distances = haversine_matrix(
+            [(lat, lon)],
+            [self.coordinates[key] for key in candidates]
+        )[0]
+        ranked = sorted(zip(distances, candidates))
+        if max_km is not None:
+            ranked = [(km, key) for km, key in ranked if km <= max_km]
+        return [(key, round(km, 3)) for km, key in ranked[:k]]
+
+    def assertMatchesBruteForce(self, **options):
+        for lat, lon in self.targets:
+            found = self.tree.nearest(lat, lon, **options)
+            expected = self.brute_force(lat, lon, **options)
+            self.assertEqual(
+                [key for key, _ in found],
+                [key for key, _ in expected]
+            )
+            for (_, km), (_, expected_km) in zip(found, expected):
+                self.assertAlmostEqual(km, expected_km, places=2)
+
+    def test_returns_all_points_by_distance(self):
+        self.assertMatchesBruteForce()
+
+    def test_limits_number_of_points(self):
+        self.assertMatchesBruteForce(k=5)
+
+    def test_cuts_off_by_distance(self):
+        self.assertMatchesBruteForce(max_km=10)
+        self.assertMatchesBruteForce(k=3, max_km=5)
+
+    def test_filters_by_keys(self):
+        keys = set(range(0, 200, 7))
+        self.assertMatchesBruteForce(keys=keys)
+        self.assertMatchesBruteForce(k=4, max_km=15, keys=keys)
+
+    def test_empty_keys_and_empty_tree(self):
+        self.assertEqual(self.tree.nearest(55.75, 37.62, keys=[]), [])
+        self.assertEqual(KDTree({}).nearest(55.75, 37.62), [])
+        self.assertEqual(KDTree({}).nearest(55.75, 37.62, k=3), [])
@@ -1,106 +1,167 @@
-from operator import itemgetter
-
-import requests
-from geopy import distance
-from loguru import logger
+from asgiref.sync import sync_to_async
+from django.utils import timezone
 
+from places.addresses import normalize_address
+from places.distances import build_distance_matrix, rank_candidates
+from places.geocoders import get_geocoder
 from places.models import Place
 
 
-def fetch_coordinates(apikey, address):
-    base_url = "https://geocode-maps.yandex.ru/1.x"
-    response = requests.get(base_url, params={
-        "geocode": address,
-        "apikey": apikey,
-        "format": "json",
-    })
-    response.raise_for_status()
-    found_places = response.json()['response']['GeoObjectCollection']['featureMember']
+def group_addresses(addresses):
+    queries = {}
+    for address in sorted(addresses):
+        queries.setdefault(normalize_address(address), address)
+    return queries
 
-    if not found_places:
-        return None
 
-    most_relevant = found_places[0]
-    lon, lat = most_relevant['GeoObject']['Point']['pos'].split(" ")
-    return lat, lon
+def get_known_places(normalized_addresses):
+    places = {}
+    for place in (
+        Place.objects
+        .filter(normalized_address__in=normalized_addresses)
+        .order_by('-geodata_update_date')
+    ):
+        places.setdefault(place.normalized_address, place)
+    return places
 
 
-def evaluate_distances_to_restaurants(
-    order,
-    api_key,
-    restaurant_places,
-    place=None
-):
-    distances = list()
-    order_address = order.address
-    try:
-        if place:
-            client_place = place
-            if not client_place.lattitude and not client_place.longitude:
-                order.distances = None
-                return order
-            client_coordinates = (
-                client_place.lattitude,
-                client_place.longitude
+def get_addresses_to_geocode(queries, places):
+    return [
+        address for normalized_address, address in queries.items()
+        if normalized_address not in places
+        or places[normalized_address].is_expired()
+    ]
+
+
+def save_geocoding_results(addresses, found_coordinates, places):
+    now = timezone.now()
+    new_places = []
+    updated_places = []
+    for address in addresses:
+        if address in found_coordinates:
+            coordinates = found_coordinates[address]
+            lookup_status = Place.FOUND if coordinates else Place.NOT_FOUND
+        else:
+            coordinates = None
+            lookup_status = Place.FAILED
+
+        normalized_address = normalize_address(address)
+        place = places.get(normalized_address)
+        if place is None:
+            place = Place(
+                address=address,
+                normalized_address=normalized_address
             )
+            new_places.append(place)
+        elif place.lookup_status == Place.FOUND and not coordinates:
+            continue
         else:
-            client_coordinates = fetch_coordinates(api_key, order_address)
-            if not client_coordinates:
-                order.distances = None
-                return order
-            Place.objects.create(
-                address=order_address,
-                lattitude=client_coordinates[0],
-                longitude=client_coordinates[1]
+            updated_places.append(place)
+        place.lookup_status = lookup_status
+        place.lattitude, place.longitude = coordinates or (None, None)
+        place.geodata_update_date = now
+
+    Place.objects.bulk_create(new_places, ignore_conflicts=True)
+    Place.objects.bulk_update(
+        updated_places,
+        ['lookup_status', 'lattitude', 'longitude', 'geodata_update_date']
+    )
+    return {
+        place.normalized_address: place
+        for place in new_places + updated_places
+    }
+
+
+def match_places(addresses, places):
+    matched_places = {}
+    for address in addresses:
+        place = places.get(normalize_address(address))
+        if place:
+            matched_places[address] = place
+    return matched_places
+
+
+def resolve_places(addresses, geocoder=None):
+    addresses = {address for address in addresses if address}
+    queries = group_addresses(addresses)
+    places = get_known_places(queries.keys())
+    addresses_to_geocode = get_addresses_to_geocode(queries, places)
+    if addresses_to_geocode:
+        geocoder = geocoder or get_geocoder()
+        found_coordinates = geocoder.geocode_many(addresses_to_geocode)
+        places.update(
+            save_geocoding_results(
+                addresses_to_geocode,
+                found_coordinates,
+                places
             )
-    except requests.exceptions.HTTPError:
-        logger.exception("Ошибка HTTP запроса:")
-        client_coordinates = None
-    except Exception:
-        logger.exception("Непредвиденная ошибка:")
-        client_coordinates = None
-    if not client_coordinates:
-        order.distances = None
-        return order
-    restaurants = order.restaurants
-    place_addresses = [place.address for place in restaurant_places]
-    for restaurant in restaurants:
-        restaurant_address = restaurant.address
-        try:
-            if restaurant_address in place_addresses:
-                for place in restaurant_places:
-                    if restaurant_address == place.address:
-                        restaurant_coordinates = (
-                            place.lattitude,
-                            place.longitude
-                        )
-            else:
-                restaurant_coordinates = fetch_coordinates(
-                    api_key,
-                    restaurant_address
-                )
-                Place.objects.create(
-                    address=restaurant_address,
-                    lattitude=restaurant_coordinates[0],
-                    longitude=restaurant_coordinates[1]
-                )
-        except requests.exceptions.HTTPError:
-            logger.exception("Ошибка HTTP запроса:")
-            distances = list()
-            break
-        except Exception:
-            logger.exception("Непредвиденная ошибка:")
-            distances = list()
-            break
-        distance_between_restaurant_and_client = (
-            distance.distance(
-                client_coordinates,
-                restaurant_coordinates
-            ).km
         )
-        distances.append([
-            restaurant,
-            round(distance_between_restaurant_and_client, 3)
-        ])
-    order.distances = sorted(distances, key=itemgetter(1))
-    return order
+    return match_places(addresses, places)
+
+
+async def aresolve_places(addresses, geocoder=None):
+    addresses = {address for address in addresses if address}
+    queries = group_addresses(addresses)
+    places = await sync_to_async(get_known_places)(queries.keys())
+    addresses_to_geocode = get_addresses_to_geocode(queries, places)
+    if addresses_to_geocode:
+        geocoder = geocoder or get_geocoder()
+        found_coordinates = await geocoder.ageocode_many(addresses_to_geocode)
+        places.update(
+            await sync_to_async(save_geocoding_results)(
+                addresses_to_geocode,
+                found_coordinates,
+                places
+            )
+        )
+    return match_places(addresses, places)
+
+
+def get_place_coordinates(place):
+    if not place or place.lattitude is None or place.longitude is None:
+        return None
+    return place.lattitude, place.longitude
+
+
+def evaluate_distances_to_restaurants(
+    orders,
+    places,
+    geo_index,
+    method='haversine',
+    limit=None,
+    max_km=None
+):
+    for order in orders:
+        client_coordinates = get_place_coordinates(places.get(order.address))
+        if not client_coordinates:
+            order.distances = None
+            continue
+
+        restaurants = {
+            restaurant.id: restaurant for restaurant in order.restaurants
+        }
+        nearest_restaurants = geo_index.nearest(
+            *client_coordinates,
+            k=limit,
+            max_km=max_km,
+            restaurant_ids=restaurants
+        )
+        if method == 'haversine':
+            distances_row = [km for _, km in nearest_restaurants]
+        else:
+            distances_row = build_distance_matrix(
+                [client_coordinates],
+                [
+                    geo_index.get(restaurant_id)
+                    for restaurant_id, _ in nearest_restaurants
+                ],
+                method=method
+            )[0]
+        order.distances = rank_candidates(
+            distances_row,
+            [
+                (restaurants[restaurant_id], column)
+                for column, (restaurant_id, _) in enumerate(nearest_restaurants)
+            ]
+        )
+    return orders
@@ -1,5 +1,53 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class RestaurateurConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
     name = 'restaurateur'
+
+    def ready(self):
+        from foodcartapp.models import (
+            Order,
+            OrderItem,
+            Restaurant,
+            RestaurantMenuItem,
+            menu_availability_changed,
+            orders_created
+        )
+        from places.geo_index import restaurant_coordinates_changed
+        from restaurateur import signals
+
+        post_save.connect(signals.publish_order_change, sender=Order)
+        post_delete.connect(signals.publish_order_change, sender=Order)
+        post_save.connect(signals.publish_order_item_change, sender=OrderItem)
+        post_delete.connect(
+            signals.publish_order_item_change,
+            sender=OrderItem
+        )
+        orders_created.connect(signals.publish_created_orders, sender=Order)
+
+        post_save.connect(
+            signals.reset_changed_order_dispatch_candidates,
+            sender=Order
+        )
+        for signal in (post_save, post_delete):
+            signal.connect(
+                signals.reset_order_item_dispatch_candidates,
+                sender=OrderItem
+            )
+            signal.connect(
+                signals.reset_all_dispatch_candidates,
+                sender=Restaurant
+            )
+            signal.connect(
+                signals.reset_all_dispatch_candidates,
+                sender=RestaurantMenuItem
+            )
+        menu_availability_changed.connect(
+            signals.reset_all_dispatch_candidates,
+            sender=RestaurantMenuItem
+        )
+        restaurant_coordinates_changed.connect(
+            signals.reset_all_dispatch_candidates
+        )
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from foodcartapp.models import Order, Restaurant
+from places.geo_index import restaurant_geo_index
+from places.utils import evaluate_distances_to_restaurants, resolve_places
+
+
+def get_retry_deadline():
+    return timezone.now() - timedelta(seconds=settings.PLACE_FAILED_TTL)
+
+
+def is_dispatch_outdated(order, retry_deadline):
+    updated_at = order.dispatch_candidates_updated_at
+    return updated_at is None or (
+        order.dispatch_candidates is None and updated_at < retry_deadline
+    )
+
+
+def filter_outdated_dispatch(orders):
+    return orders.filter(
+        Q(dispatch_candidates_updated_at__isnull=True)
+        | Q(
+            dispatch_candidates__isnull=True,
+            dispatch_candidates_updated_at__lt=get_retry_deadline()
+        )
+    )
+
+
+def update_dispatch_candidates(orders):
+    orders = list(orders.find_available_restaurants())
+    places = resolve_places([order.address for order in orders])
+    evaluate_distances_to_restaurants(
+        orders=orders,
+        places=places,
+        geo_index=restaurant_geo_index,
+        method=settings.DISTANCE_METHOD,
+        limit=settings.DISPATCH_CANDIDATES_LIMIT,
+        max_km=settings.DISPATCH_MAX_KM
+    )
+    updated_at = timezone.now()
+    for order in orders:
+        if order.distances is None:
+            order.dispatch_candidates = None
+        else:
+            order.dispatch_candidates = [
+                [restaurant.id, distance]
+                for restaurant, distance in order.distances
+            ]
+        order.dispatch_candidates_updated_at = updated_at
+    Order.objects.bulk_update(
+        orders,
+        ['dispatch_candidates', 'dispatch_candidates_updated_at']
+    )
+    return {order.id: order for order in orders}
+
+
+def update_pending_dispatch_candidates(batch_size):
+    order_ids = list(
+        filter_outdated_dispatch(Order.objects.awaiting_dispatch())
+        .order_by('id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if order_ids:
+        update_dispatch_candidates(Order.objects.filter(id__in=order_ids))
+    return order_ids
+
+
+def reset_dispatch_candidates(orders=None):
+    if orders is None:
+        orders = Order.objects.awaiting_dispatch()
+    return (
+        orders
+        .filter(dispatch_candidates_updated_at__isnull=False)
+        .update(dispatch_candidates_updated_at=None)
+    )
+
+
+def attach_dispatch_candidates(orders):
+    retry_deadline = get_retry_deadline()
+    pending_order_ids = [
+        order.id for order in orders
+        if not order.cooking_restaurant_id
+        and is_dispatch_outdated(order, retry_deadline)
+    ]
+    if pending_order_ids:
+        updated_orders = update_dispatch_candidates(
+            Order.objects.filter(id__in=pending_order_ids)
+        )
+        for order in orders:
+            if order.id in updated_orders:
+                order.dispatch_candidates = (
+                    updated_orders[order.id].dispatch_candidates
+                )
+
+    restaurants = Restaurant.objects.in_bulk({
+        restaurant_id
+        for order in orders
+        for restaurant_id, _ in order.dispatch_candidates or []
+    })
+    for order in orders:
+        if order.dispatch_candidates is None:
+            order.distances = None
+            continue
+        order.distances = [
+            [restaurants[restaurant_id], distance]
+            for restaurant_id, distance in order.dispatch_candidates
+            if restaurant_id in restaurants
+        ]
+    return orders
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from restaurateur.dispatch import update_pending_dispatch_candidates
+from restaurateur.signals import publish_order_changes
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рестораны, которые могут приготовить заказы'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='пауза в секундах, когда пересчитывать нечего',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='пересчитать накопившиеся заказы и выйти',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            order_ids = update_pending_dispatch_candidates(
+                options['batch_size']
+            )
+            if order_ids:
+                publish_order_changes(order_ids)
+                self.stdout.write(f'Пересчитано заказов: {len(order_ids)}')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
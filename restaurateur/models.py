@@ -1,3 +1,17 @@
 from django.db import models
 
-# Create your models here.
+
+class OrderBoardEvent(models.Model):
+    order_id = models.IntegerField('заказ', db_index=True)
+    created_at = models.DateTimeField(
+        'дата и время изменения',
+        auto_now_add=True,
+        db_index=True,
+    )
+
+    class Meta:
+        verbose_name = 'изменение заказа'
+        verbose_name_plural = 'изменения заказов'
+
+    def __str__(self):
+        return f'{self.id}: {self.order_id}'
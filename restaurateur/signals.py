@@ -0,0 +1,45 @@
+from django.db import transaction
+
+from foodcartapp.models import Order
+from restaurateur.dispatch import reset_dispatch_candidates
+from restaurateur.models import OrderBoardEvent
+
+
+def publish_order_changes(order_ids):
+    OrderBoardEvent.objects.bulk_create([
+        OrderBoardEvent(order_id=order_id) for order_id in set(order_ids)
+    ])
+
+
+def publish_order_change(sender, instance, **kwargs):
+    order_id = instance.id
+    transaction.on_commit(lambda: publish_order_changes([order_id]))
+
+
+def publish_order_item_change(sender, instance, **kwargs):
+    order_id = instance.order_id
+    transaction.on_commit(lambda: publish_order_changes([order_id]))
+
+
+def publish_created_orders(sender, orders, **kwargs):
+    order_ids = [order.id for order in orders]
+    transaction.on_commit(lambda: publish_order_changes(order_ids))
+
+
+def reset_order_dispatch_candidates(order_id):
+    transaction.on_commit(
+        lambda: reset_dispatch_candidates(Order.objects.filter(id=order_id))
+    )
+
+
+def reset_changed_order_dispatch_candidates(sender, instance, **kwargs):
+    if not kwargs.get('created'):
+        reset_order_dispatch_candidates(instance.id)
+
+
+def reset_order_item_dispatch_candidates(sender, instance, **kwargs):
+    reset_order_dispatch_candidates(instance.order_id)
+
+
+def reset_all_dispatch_candidates(sender, **kwargs):
+    transaction.on_commit(reset_dispatch_candidates)
@@ -1,3 +1,229 @@
-from django.test import TestCase
+import json
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from foodcartapp.models import Order
+from foodcartapp.synthetic import generate_dataset
+from places.geo_index import restaurant_geo_index
+from places.geocoders import get_geocoder
+from restaurateur.dispatch import update_pending_dispatch_candidates
+
+QUERY_BUDGETS = {
+    'product_list_api': 1,
+    'product_list_api (кэш)': 0,
+    'register_order': 9,
+    'view_orders': 8,
+    'view_products': 7,
+    'view_products (кэш)': 4,
+}
+
+benchmark_results = []
+
+
+benchmark_settings = override_settings(
+    GEOCODER={'BACKEND': 'places.geocoders.FakeGeocoder', 'OPTIONS': {}},
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    },
+    ORDER_INTAKE_MODE='sync',
+    ORDERS_PAGE_SIZE=50,
+    DISPATCH_CANDIDATES_LIMIT=None,
+    DISPATCH_MAX_KM=None,
+)
+
+
+class EndpointBenchmarkMixin:
+    scale = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        get_geocoder.cache_clear()
+        cls.restaurants, cls.products, cls.orders = generate_dataset(
+            **cls.scale
+        )
+        update_pending_dispatch_candidates(batch_size=len(cls.orders))
+        cls.manager = User.objects.create_user(
+            'manager',
+            password='password',
+            is_staff=True
+        )
+
+    def setUp(self):
+        cache.clear()
+        get_geocoder.cache_clear()
+        restaurant_geo_index.invalidate()
+        self.client.force_login(self.manager)
+
+    def measure(self, name, send_request, reset_cache=False):
+        if reset_cache:
+            cache.clear()
+        started_at = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = send_request()
+        elapsed = time.perf_counter() - started_at
+        queries_count = len(queries)
+
+        if reset_cache:
+            cache.clear()
+        tracemalloc.start()
+        send_request()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        benchmark_results.append(
+            (self.__class__.__name__, name, elapsed, queries_count, peak_memory)
+        )
+        self.assertLess(response.status_code, 400)
+        self.assertLessEqual(
+            queries_count,
+            QUERY_BUDGETS[name],
+            f'{name}: {queries_count} запросов вместо {QUERY_BUDGETS[name]}'
+        )
+        return response
+
+    def test_product_list_api(self):
+        self.client.logout()
+        self.measure(
+            'product_list_api',
+            lambda: self.client.get('/api/products/'),
+            reset_cache=True
+        )
+        self.measure('product_list_api (кэш)', lambda: self.client.get(
+            '/api/products/'
+        ))
+
+    def test_register_order(self):
+        self.client.logout()
+        order_payload = json.dumps({
+            'firstname': 'Иван',
+            'lastname': 'Петров',
+            'phonenumber': '+79161234567',
+            'address': 'Москва, ул. Тверская, д. 1',
+            'products': [
+                {'product': product.id, 'quantity': 2}
+                for product in self.products[:20]
+            ],
+        })
+        self.measure('register_order', lambda: self.client.post(
+            '/api/order/',
+            order_payload,
+            content_type='application/json'
+        ))
+
+    def test_view_orders(self):
+        self.client.get('/manager/orders/')
+        response = self.measure('view_orders', lambda: self.client.get(
+            '/manager/orders/'
+        ))
+        self.assertEqual(
+            len(response.context['order_items']),
+            min(50, len(self.orders))
+        )
+
+    def test_view_products(self):
+        self.measure(
+            'view_products',
+            lambda: self.client.get('/manager/products/'),
+            reset_cache=True
+        )
+        self.measure('view_products (кэш)', lambda: self.client.get(
+            '/manager/products/'
+        ))
+
+
+@benchmark_settings
+class SmallScaleBenchmark(EndpointBenchmarkMixin, TestCase):
+    scale = {'restaurants': 5, 'products': 20, 'orders': 50}
+
+
+@benchmark_settings
+class MediumScaleBenchmark(EndpointBenchmarkMixin, TestCase):
+    scale = {'restaurants': 20, 'products': 100, 'orders': 500}
+
+
+@benchmark_settings
+class LargeScaleBenchmark(EndpointBenchmarkMixin, TestCase):
+    scale = {'restaurants': 40, 'products': 200, 'orders': 2000}
+
+
+@override_settings(ORDERS_PAGE_SIZE=4)
+@benchmark_settings
+class BoardPagingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        get_geocoder.cache_clear()
+        _, _, orders = generate_dataset(
+            restaurants=3,
+            products=10,
+            orders=30
+        )
+        created_at = timezone.now()
+        for number, order in enumerate(orders):
+            Order.objects.filter(id=order.id).update(
+                status=['1', '2', '3'][number % 3],
+                created_at=created_at + timedelta(seconds=number % 2)
+            )
+        update_pending_dispatch_candidates(batch_size=len(orders))
+        cls.expected_ids = list(
+            Order.objects
+            .exclude(status='4')
+            .order_by('status', 'created_at', 'id')
+            .values_list('id', flat=True)
+        )
+        cls.manager = User.objects.create_user('manager', is_staff=True)
+
+    def setUp(self):
+        restaurant_geo_index.invalidate()
+        self.client.force_login(self.manager)
+
+    def get_page_ids(self, query=''):
+        response = self.client.get(f'/manager/orders/?{query}')
+        return (
+            [order.id for order in response.context['order_items']],
+            response.context['next_page_query'],
+        )
+
+    def test_pages_have_no_gaps_or_duplicates(self):
+        seen_ids = []
+        page_ids, next_page_query = self.get_page_ids()
+        self.assertEqual(len(page_ids), 4)
+        seen_ids.extend(page_ids)
+        while next_page_query:
+            page_ids, next_page_query = self.get_page_ids(next_page_query)
+            self.assertTrue(page_ids)
+            seen_ids.extend(page_ids)
+
+        self.assertEqual(seen_ids, self.expected_ids)
+
+    def test_malformed_cursor_shows_first_page(self):
+        first_page_ids, _ = self.get_page_ids()
+
+        for cursor in ['garbage', 'W10', 'WyIxIl0']:
+            page_ids, _ = self.get_page_ids(f'after={cursor}')
+            self.assertEqual(page_ids, first_page_ids)
+
+
+def tearDownModule():
+    if not benchmark_results:
+        return
+    sys.stderr.write(
+        f'\n{"масштаб":<22}{"эндпоинт":<26}{"мс":>9}{"запросов":>10}'
+        f'{"КиБ":>10}\n'
+    )
+    for scale, name, elapsed, queries_count, peak_memory in benchmark_results:
+        sys.stderr.write(
+            f'{scale:<22}{name:<26}{elapsed * 1000:>9.1f}'
+            f'{queries_count:>10}{peak_memory / 1024:>10.0f}\n'
+        )
@@ -14,6 +14,14 @@ urlpatterns = [
 
     # TODO заглушка для нереализованного функционала
     path('orders/', views.view_orders, name="view_orders"),
+    path('orders/stream/', views.stream_orders, name="stream_orders"),
+    path('metrics/', views.view_metrics, name="view_metrics"),
+    path('profiles/', views.view_profiles, name="view_profiles"),
+    path(
+        'profiles/<str:name>/',
+        views.download_profile,
+        name="download_profile"
+    ),
 
     path('login/', views.LoginView.as_view(), name="login"),
     path('logout/', views.LogoutView.as_view(), name="logout"),
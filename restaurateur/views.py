@@ -1,16 +1,43 @@
+import json
+import time
+from datetime import datetime, timedelta
+
 from django import forms
 from django.conf import settings
 from django.contrib.auth import authenticate, login
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.decorators import user_passes_test
-from django.db.models import Sum
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Max
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse
+)
 from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.views import View
 from django.urls import reverse_lazy
 
+from foodcartapp.catalogue import (
+    availability_matrix,
+    catalogue,
+    unpack_availability
+)
 from foodcartapp.models import Product, Restaurant, Order
-from places.models import Place
-from places.utils import evaluate_distances_to_restaurants
+from restaurateur.dispatch import attach_dispatch_candidates
+from restaurateur.models import OrderBoardEvent
+from star_burger.metrics import (
+    format_prometheus,
+    metrics_buffer,
+    summarize_samples
+)
+from star_burger.profiling import get_profile_path, list_profiles
+from star_burger.renderers import JsonResponse
 
 
 class Login(forms.Form):
@@ -67,26 +94,27 @@ def is_manager(user):
 
 @user_passes_test(is_manager, login_url='restaurateur:login')
 def view_products(request):
-    restaurants = list(Restaurant.objects.order_by('name'))
-    products = list(Product.objects.prefetch_related('menu_items'))
-
-    default_availability = {restaurant.id: False for restaurant in restaurants}
-    products_with_restaurants = []
-    for product in products:
+    matrix = availability_matrix.get()
+    restaurants = matrix['restaurants']
 
-        availability = {
-            **default_availability,
-            **{item.restaurant_id: item.availability for item in product.menu_items.all()},
-        }
-        orderer_availability = [availability[restaurant.id] for restaurant in restaurants]
-
-        products_with_restaurants.append(
-            (product, orderer_availability)
-        )
+    def get_products_with_restaurants():
+        products = Product.objects.select_related('category')
+        return [
+            (
+                product,
+                unpack_availability(
+                    matrix['rows'].get(product.id, 0),
+                    len(restaurants)
+                ),
+            )
+            for product in products
+        ]
 
     return render(request, template_name="products_list.html", context={
-        'products_with_restaurants': products_with_restaurants,
+        'products_with_restaurants': get_products_with_restaurants,
         'restaurants': restaurants,
+        'products_version': (matrix['version'], catalogue.get_version()),
+        'cache_timeout': settings.CACHE_PAYLOAD_TIMEOUT,
     })
 
 
@@ -97,37 +125,264 @@ def view_restaurants(request):
     })
 
 
-@user_passes_test(is_manager, login_url='restaurateur:login')
-def view_orders(request):
+class OrderFilterForm(forms.Form):
+    status = forms.ChoiceField(
+        label='Статус',
+        required=False,
+        choices=[('', 'Все')] + [
+            (status, name) for status, name in Order.STATUSES
+            if status != '4'
+        ],
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    restaurant = forms.ModelChoiceField(
+        label='Ресторан',
+        required=False,
+        queryset=Restaurant.objects.order_by('name'),
+        empty_label='Все',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    payment_method = forms.ChoiceField(
+        label='Способ оплаты',
+        required=False,
+        choices=[('', 'Все')] + Order.PAYMENT_METHODS,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    after = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    def clean_after(self):
+        cursor = self.cleaned_data['after']
+        if not cursor:
+            return None
+        try:
+            return decode_board_cursor(cursor)
+        except (ValueError, TypeError):
+            raise forms.ValidationError('Неверная позиция страницы')
+
+
+def encode_board_cursor(order):
+    cursor = json.dumps([order.status, order.created_at.isoformat(), order.id])
+    return urlsafe_base64_encode(cursor.encode())
+
+
+def decode_board_cursor(cursor):
+    status, created_at, order_id = json.loads(urlsafe_base64_decode(cursor))
+    return str(status), datetime.fromisoformat(created_at), int(order_id)
+
+
+def filter_board_orders(filters):
     orders = (
         Order.objects
         .exclude(status='4')
-        .annotate(cost=Sum('items__cost'))
-        .find_available_restaurants()
+        .select_related('cooking_restaurant')
+        .order_for_board()
     )
-    order_addresses = [order.address for order in orders]
-    places = Place.objects.filter(address__in=order_addresses)
-    place_addresses = [place.address for place in places]
-    restaurants = Restaurant.objects.all()
-    restaurant_addresses = [restaurant.address for restaurant in restaurants]
-    restaurant_places = Place.objects.filter(address__in=restaurant_addresses)
+    if filters.get('status'):
+        orders = orders.filter(status=filters['status'])
+    if filters.get('restaurant'):
+        orders = orders.filter(cooking_restaurant=filters['restaurant'])
+    if filters.get('payment_method'):
+        orders = orders.filter(payment_method=filters['payment_method'])
+    return orders
+
+
+def get_board_position(status, created_at, order_id):
+    return json.dumps([status, created_at.timestamp(), order_id])
+
+
+def prepare_board_orders(orders):
+    orders = attach_dispatch_candidates(list(orders))
     for order in orders:
-        if order.address in place_addresses:
-            for place in places:
-                if order.address == place.address:
-                    order = evaluate_distances_to_restaurants(
-                        order=order,
-                        api_key=settings.YANDEX_GEO_API_KEY,
-                        restaurant_places=restaurant_places,
-                        place=place
-                    )
-        else:
-            order = evaluate_distances_to_restaurants(
-                order=order,
-                api_key=settings.YANDEX_GEO_API_KEY,
-                restaurant_places=restaurant_places
-            )
+        order.board_position = get_board_position(
+            order.status,
+            order.created_at,
+            order.id
+        )
+    return orders
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def view_orders(request):
+    filter_form = OrderFilterForm(request.GET)
+    filter_form.is_valid()
+    filters = filter_form.cleaned_data
+
+    orders = filter_board_orders(filters)
+    if filters.get('after'):
+        orders = orders.after_board_position(*filters['after'])
+
+    page_size = settings.ORDERS_PAGE_SIZE
+    orders = prepare_board_orders(orders[:page_size + 1])
+    next_cursor = None
+    if len(orders) > page_size:
+        orders = orders[:page_size]
+        next_cursor = encode_board_cursor(orders[-1])
+
+    next_page_query = None
+    if next_cursor:
+        next_page_query = request.GET.copy()
+        next_page_query['after'] = next_cursor
+        next_page_query = next_page_query.urlencode()
+    first_page_query = request.GET.copy()
+    first_page_query.pop('after', None)
+    stream_query = None
+    if not isinstance(request, ASGIRequest):
+        stream_query = first_page_query.copy()
+        stream_query['last_event_id'] = (
+            OrderBoardEvent.objects.aggregate(last_id=Max('id'))['last_id']
+            or 0
+        )
 
     return render(request, template_name='order_items.html', context={
         'order_items': orders,
+        'filter_form': filter_form,
+        'next_page_query': next_page_query,
+        'first_page_query': first_page_query.urlencode(),
+        'is_first_page': not filters.get('after'),
+        'stream_query': stream_query.urlencode() if stream_query else '',
+        'after_position': (
+            get_board_position(*filters['after'])
+            if filters.get('after') else ''
+        ),
+        'last_position': orders[-1].board_position if next_cursor else '',
+    })
+
+
+def format_board_event(event_id, data):
+    return (
+        f'id: {event_id}\n'
+        'event: order\n'
+        f'data: {json.dumps(data, ensure_ascii=False)}\n\n'
+    )
+
+
+def stream_board_events(filters, last_event_id):
+    deadline = time.monotonic() + settings.ORDERS_STREAM_TIMEOUT
+    last_sent_at = time.monotonic()
+    yield f'retry: {settings.ORDERS_STREAM_RETRY_MS}\n\n'
+
+    while time.monotonic() < deadline:
+        events = list(
+            OrderBoardEvent.objects
+            .filter(id__gt=last_event_id)
+            .order_by('id')
+            .values_list('id', 'order_id')[:settings.ORDERS_STREAM_BATCH_SIZE]
+        )
+        if events:
+            last_event_id = events[-1][0]
+            order_ids = {order_id for _, order_id in events}
+            orders = prepare_board_orders(
+                filter_board_orders(filters).filter(id__in=order_ids)
+            )
+            for order in orders:
+                yield format_board_event(last_event_id, {
+                    'id': order.id,
+                    'action': 'upsert',
+                    'position': order.board_position,
+                    'html': render_to_string(
+                        'order_row.html',
+                        {'item': order}
+                    ),
+                })
+            for order_id in order_ids - {order.id for order in orders}:
+                yield format_board_event(last_event_id, {
+                    'id': order_id,
+                    'action': 'remove',
+                })
+            last_sent_at = time.monotonic()
+            continue
+
+        if time.monotonic() - last_sent_at > settings.ORDERS_STREAM_KEEPALIVE:
+            yield ': keepalive\n\n'
+            last_sent_at = time.monotonic()
+        time.sleep(settings.ORDERS_STREAM_POLL_INTERVAL)
+
+
+@transaction.non_atomic_requests
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def stream_orders(request):
+    if isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    filter_form = OrderFilterForm(request.GET)
+    filter_form.is_valid()
+    filters = filter_form.cleaned_data
+    filters.pop('after', None)
+
+    last_event_id = request.headers.get(
+        'Last-Event-ID',
+        request.GET.get('last_event_id', '')
+    )
+    try:
+        last_event_id = int(last_event_id)
+    except ValueError:
+        last_event_id = (
+            OrderBoardEvent.objects.aggregate(last_id=Max('id'))['last_id']
+            or 0
+        )
+
+    OrderBoardEvent.objects.filter(
+        created_at__lt=timezone.now() - timedelta(
+            seconds=settings.ORDERS_STREAM_EVENTS_RETENTION
+        )
+    ).delete()
+
+    response = StreamingHttpResponse(
+        stream_board_events(filters, last_event_id),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def view_metrics(request):
+    samples = metrics_buffer.get_samples()
+    summary = summarize_samples(samples)
+    if request.GET.get('format') == 'prometheus':
+        return HttpResponse(
+            format_prometheus(summary),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+    recent_count = request.GET.get('recent', '')
+    recent_count = int(recent_count) if recent_count.isdigit() else 50
+    return JsonResponse({
+        'samples_count': len(samples),
+        'views': summary,
+        'recent': samples[max(len(samples) - recent_count, 0):],
+    })
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def view_profiles(request):
+    profiles = [
+        {
+            'name': path.name,
+            'size': path.stat().st_size,
+            'created_at': datetime.fromtimestamp(
+                path.stat().st_mtime,
+                tz=timezone.get_current_timezone()
+            ),
+        }
+        for path in list_profiles()
+    ]
+    return render(request, template_name='profiles_list.html', context={
+        'profiles': profiles,
+        'profiler_enabled': settings.PROFILER_ENABLED,
+        'profiler_threshold': settings.PROFILER_THRESHOLD,
+        'profiler_header': settings.PROFILER_HEADER,
     })
+
+
+@user_passes_test(is_manager, login_url='restaurateur:login')
+def download_profile(request, name):
+    path = get_profile_path(name)
+    if path is None:
+        raise Http404('Профиль не найден')
+    return FileResponse(
+        open(path, 'rb'),
+        as_attachment=True,
+        filename=path.name,
+        content_type='text/plain; charset=utf-8'
+    )
@@ -0,0 +1,214 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+request_metrics = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.timings = defaultdict(float)
+
+    def add(self, name, seconds, count=1):
+        self.counts[name] += count
+        self.timings[name] += seconds
+
+
+@contextmanager
+def track(name, count=1):
+    metrics = request_metrics.get()
+    if metrics is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(name, time.perf_counter() - started_at, count)
+
+
+def time_query(execute, sql, params, many, context):
+    with track('db'):
+        return execute(sql, params, many, context)
+
+
+def install_query_timer(connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class MetricsBuffer:
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def append(self, sample):
+        with self.lock:
+            self.samples.append(sample)
+
+    def get_samples(self):
+        with self.lock:
+            return list(self.samples)
+
+
+def get_percentile(sorted_values, percent):
+    index = max(0, round(percent / 100 * len(sorted_values)) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def summarize_samples(samples):
+    samples_by_view = defaultdict(list)
+    for sample in samples:
+        samples_by_view[sample['view']].append(sample)
+
+    summary = {}
+    for view, view_samples in samples_by_view.items():
+        durations = sorted(sample['duration'] for sample in view_samples)
+        summary[view] = {
+            'requests': len(view_samples),
+            'errors': sum(
+                1 for sample in view_samples if sample['status'] >= 500
+            ),
+            'duration_sum': sum(durations),
+            'duration_p50': get_percentile(durations, 50),
+            'duration_p95': get_percentile(durations, 95),
+            'duration_p99': get_percentile(durations, 99),
+            **{
+                field: sum(sample[field] for sample in view_samples)
+                for field in [
+                    'db_queries',
+                    'db_time',
+                    'geocoder_calls',
+                    'geocoder_time',
+                    'serialization_time',
+                ]
+            },
+        }
+    return summary
+
+
+PROMETHEUS_METRICS = [
+    ('requests', 'starburger_requests', 'Запросов в окне'),
+    ('errors', 'starburger_request_errors', 'Ответов 5xx в окне'),
+    ('db_queries', 'starburger_db_queries', 'SQL-запросов в окне'),
+    ('db_time', 'starburger_db_seconds', 'Время SQL-запросов'),
+    (
+        'geocoder_calls',
+        'starburger_geocoder_calls',
+        'Адресов отправлено в геокодер'
+    ),
+    (
+        'geocoder_time',
+        'starburger_geocoder_seconds',
+        'Время ожидания геокодера'
+    ),
+    (
+        'serialization_time',
+        'starburger_serialization_seconds',
+        'Время сериализации JSON'
+    ),
+]
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def format_prometheus(summary):
+    lines = [
+        '# HELP starburger_request_duration_seconds Время ответа',
+        '# TYPE starburger_request_duration_seconds summary',
+    ]
+    for view, view_summary in sorted(summary.items()):
+        label = f'view="{escape_label(view)}"'
+        for quantile, percent in [('0.5', 50), ('0.95', 95), ('0.99', 99)]:
+            lines.append(
+                f'starburger_request_duration_seconds'
+                f'{{{label},quantile="{quantile}"}} '
+                f'{view_summary[f"duration_p{percent}"]}'
+            )
+        lines.append(
+            f'starburger_request_duration_seconds_sum{{{label}}} '
+            f'{view_summary["duration_sum"]}'
+        )
+        lines.append(
+            f'starburger_request_duration_seconds_count{{{label}}} '
+            f'{view_summary["requests"]}'
+        )
+    for field, name, description in PROMETHEUS_METRICS:
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} gauge')
+        for view, view_summary in sorted(summary.items()):
+            lines.append(
+                f'{name}{{view="{escape_label(view)}"}} {view_summary[field]}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+metrics_buffer = MetricsBuffer(settings.METRICS_BUFFER_SIZE)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+        connection_created.connect(install_query_timer)
+        for connection in connections.all():
+            install_query_timer(connection)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = request_metrics.set(metrics)
+        started_at = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_metrics.reset(token)
+        self.record(request, response, metrics, started_at)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = request_metrics.set(metrics)
+        started_at = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_metrics.reset(token)
+        self.record(request, response, metrics, started_at)
+        return response
+
+    def record(self, request, response, metrics, started_at):
+        resolver_match = request.resolver_match
+        view = resolver_match.view_name if resolver_match else 'unresolved'
+        metrics_buffer.append({
+            'view': view,
+            'method': request.method,
+            'status': response.status_code,
+            'time': timezone.now(),
+            'duration': time.perf_counter() - started_at,
+            'db_queries': metrics.counts['db'],
+            'db_time': metrics.timings['db'],
+            'geocoder_calls': metrics.counts['geocoder'],
+            'geocoder_time': metrics.timings['geocoder'],
+            'serialization_time': metrics.timings['serialization'],
+        })
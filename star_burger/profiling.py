@@ -0,0 +1,152 @@
+import asyncio
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+
+PROFILE_NAME_PATTERN = re.compile(r'^[\w.-]+\.folded$')
+
+
+class SamplingProfiler:
+    def __init__(self, interval):
+        self.interval = interval
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.active = threading.Event()
+        self.thread = None
+
+    def start(self):
+        thread_id = threading.get_ident()
+        samples = Counter()
+        with self.lock:
+            self.sessions[thread_id] = samples
+            self.active.set()
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.sample_forever,
+                    name='request-profiler',
+                    daemon=True
+                )
+                self.thread.start()
+        return samples
+
+    def stop(self):
+        with self.lock:
+            samples = self.sessions.pop(threading.get_ident(), Counter())
+            if not self.sessions:
+                self.active.clear()
+        return samples
+
+    def sample_forever(self):
+        while True:
+            self.active.wait()
+            time.sleep(self.interval)
+            with self.lock:
+                frames = sys._current_frames()
+                for thread_id, samples in self.sessions.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[self.get_stack(frame)] += 1
+
+    def get_stack(self, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(
+                f'{code.co_name} ({code.co_filename}:{frame.f_lineno})'
+            )
+            frame = frame.f_back
+        return ';'.join(reversed(stack))
+
+
+def get_profiles_dir():
+    return Path(settings.PROFILER_DIR)
+
+
+def list_profiles():
+    profiles_dir = get_profiles_dir()
+    if not profiles_dir.is_dir():
+        return []
+    return sorted(
+        (
+            path for path in profiles_dir.iterdir()
+            if PROFILE_NAME_PATTERN.match(path.name)
+        ),
+        key=lambda path: path.name,
+        reverse=True
+    )
+
+
+def get_profile_path(name):
+    if not PROFILE_NAME_PATTERN.match(name):
+        return None
+    path = get_profiles_dir() / name
+    return path if path.is_file() else None
+
+
+def save_profile(samples, view, duration):
+    profiles_dir = get_profiles_dir()
+    profiles_dir.mkdir(parents=True, exist_ok=True)
+    view = re.sub(r'[^\w.-]+', '-', view)
+    name = (
+        f'{timezone.now():%Y%m%d-%H%M%S-%f}-{view}-'
+        f'{round(duration * 1000)}ms.folded'
+    )
+    (profiles_dir / name).write_text(
+        ''.join(f'{stack} {count}\n' for stack, count in samples.items()),
+        encoding='utf-8'
+    )
+    for path in list_profiles()[settings.PROFILER_MAX_FILES:]:
+        path.unlink(missing_ok=True)
+    return name
+
+
+class SlowRequestProfilerMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.profiler = SamplingProfiler(settings.PROFILER_INTERVAL)
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.get_response(request)
+
+        samples = self.profiler.start()
+        started_at = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            self.profiler.stop()
+        duration = time.perf_counter() - started_at
+
+        is_requested = self.is_profile_requested(request)
+        if samples and (
+            duration >= settings.PROFILER_THRESHOLD or is_requested
+        ):
+            resolver_match = request.resolver_match
+            view = resolver_match.view_name if resolver_match else 'unresolved'
+            profile_name = save_profile(samples, view, duration)
+            if is_requested:
+                response['X-Profile-Name'] = profile_name
+        return response
+
+    def is_profile_requested(self, request):
+        user = getattr(request, 'user', None)
+        return bool(
+            settings.PROFILER_HEADER
+            and request.headers.get(settings.PROFILER_HEADER)
+            and user is not None
+            and user.is_staff
+        )
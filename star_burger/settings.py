@@ -34,10 +34,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'star_burger.metrics.MetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'star_burger.profiling.SlowRequestProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -81,6 +83,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'star_burger.wsgi.application'
+ASGI_APPLICATION = 'star_burger.asgi.application'
+ASYNC_API = env.bool('ASYNC_API', False)
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
@@ -97,6 +101,21 @@ DATABASES = {
 }
 DATABASES['default']['ATOMIC_REQUESTS'] = True
 
+CACHES = {
+    'default': env.dj_cache_url('CACHE_URL', 'locmem://'),
+}
+if CACHES['default']['BACKEND'].endswith('.redis.RedisCache'):
+    CACHES['default']['BACKEND'] = 'django_redis.cache.RedisCache'
+CACHE_PAYLOAD_TIMEOUT = env.int('CACHE_PAYLOAD_TIMEOUT', 300)
+BANNERS_CACHE_MAX_AGE = env.int('BANNERS_CACHE_MAX_AGE', 600)
+
+ORDERS_BATCH_MAX_SIZE = env.int('ORDERS_BATCH_MAX_SIZE', 500)
+ORDER_INTAKE_MODE = env.str('ORDER_INTAKE_MODE', 'sync')
+ORDER_INTAKE_JOURNAL = env.str(
+    'ORDER_INTAKE_JOURNAL',
+    os.path.join(BASE_DIR, 'order_intake.sqlite3')
+)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -135,6 +154,53 @@ STATICFILES_DIRS = [
 
 YANDEX_GEO_API_KEY = env('YANDEX_GEO_API_KEY')
 
+GEOCODER = {
+    'BACKEND': env.str('GEOCODER_BACKEND', 'places.geocoders.YandexGeocoder'),
+    'OPTIONS': {
+        'apikey': YANDEX_GEO_API_KEY,
+        'max_concurrency': env.int('GEOCODER_MAX_CONCURRENCY', 10),
+        'timeout': env.float('GEOCODER_TIMEOUT', 5),
+        'retries': env.int('GEOCODER_RETRIES', 2),
+        'failure_threshold': env.int('GEOCODER_FAILURE_THRESHOLD', 5),
+        'reset_timeout': env.int('GEOCODER_RESET_TIMEOUT', 30),
+        'total_timeout': env.float('GEOCODER_TOTAL_TIMEOUT', 15),
+    },
+}
+
+PLACE_REFRESH_AFTER = env.int('PLACE_REFRESH_AFTER', 30 * 24 * 60 * 60)
+PLACE_NOT_FOUND_TTL = env.int('PLACE_NOT_FOUND_TTL', 7 * 24 * 60 * 60)
+PLACE_FAILED_TTL = env.int('PLACE_FAILED_TTL', 10 * 60)
+
+DISTANCE_METHOD = env.str('DISTANCE_METHOD', 'haversine')
+DISPATCH_CANDIDATES_LIMIT = env.int('DISPATCH_CANDIDATES_LIMIT', None)
+DISPATCH_MAX_KM = env.float('DISPATCH_MAX_KM', None)
+ORDERS_PAGE_SIZE = env.int('ORDERS_PAGE_SIZE', 50)
+ORDERS_STREAM_TIMEOUT = env.int('ORDERS_STREAM_TIMEOUT', 60)
+ORDERS_STREAM_POLL_INTERVAL = env.float('ORDERS_STREAM_POLL_INTERVAL', 1)
+ORDERS_STREAM_KEEPALIVE = 15
+ORDERS_STREAM_RETRY_MS = 3000
+ORDERS_STREAM_BATCH_SIZE = 200
+ORDERS_STREAM_EVENTS_RETENTION = 60 * 60
+
+METRICS_ENABLED = env.bool('METRICS_ENABLED', True)
+METRICS_BUFFER_SIZE = env.int('METRICS_BUFFER_SIZE', 2000)
+
+PROFILER_ENABLED = env.bool('PROFILER_ENABLED', False)
+PROFILER_THRESHOLD = env.float('PROFILER_THRESHOLD', 2)
+PROFILER_INTERVAL = env.float('PROFILER_INTERVAL', 0.005)
+PROFILER_HEADER = env.str('PROFILER_HEADER', 'X-Profile')
+PROFILER_DIR = env.str('PROFILER_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILER_MAX_FILES = env.int('PROFILER_MAX_FILES', 50)
+
+JSON_PRETTY = env.bool('JSON_PRETTY', False)
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'star_burger.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
 # Rollbar settings
 ROLLBAR = {
     'access_token': env.str('ROLLBAR_TOKEN'),